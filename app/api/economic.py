@@ -1,28 +1,52 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from functools import lru_cache
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
-import os
+import threading
+import time
+import orjson
 
 from database import get_db
 from services.economic_service import EconomicService
 import app.crud.economic_snapshot as economic_crud
 import app.schemas as schemas
 from app.services.sector_economic_rating import SectorEconomicRatingService
-from config import get_settings
+from app.utils.kv_cache import get_kv_cache
+from app.utils.num import r2 as _r2
+from config import Settings, get_settings
 
 router = APIRouter()
 
-settings = get_settings()
-economic_service = EconomicService(api_key=settings.fred_api_key)
 sector_rating_service = SectorEconomicRatingService()
 
+# Process-local cache of the normalized latest snapshot. Snapshots change a few
+# times a day at most, so requests within the TTL skip the DB entirely; after
+# the TTL only the latest id is queried and the payload is rebuilt if it moved.
+_snapshot_cache: Dict[str, Any] = {
+    "snapshot_id": None,
+    "payload": None,
+    "indicators": None,
+    "etag": None,
+    # payload/indicators pre-encoded once per snapshot, served as-is
+    "encoded": None,
+    "expires_at": 0.0,
+}
+_snapshot_cache_lock = threading.Lock()
+# Behind the per-process cache, workers share the entry through the KV cache
+# (Redis when configured, economic_shared_cache_ttl_seconds) so a local miss
+# costs each of them only the latest-id check, not a snapshot read + rebuild
 
-def _r2(val):
-    return (
-        round(float(val), 2)
-        if isinstance(val, (int, float)) and val is not None
-        else val
-    )
+
+@lru_cache
+def _economic_service_for(api_key: str) -> EconomicService:
+    return EconomicService(api_key=api_key)
+
+
+def get_economic_service(
+    settings: Settings = Depends(get_settings),
+) -> EconomicService:
+    # Built lazily on first use and shared per API key (keeps its release cache)
+    return _economic_service_for(settings.fred_api_key)
 
 
 def _normalize_snapshot(snapshot) -> Dict[str, Any]:
@@ -53,13 +77,111 @@ def _normalize_snapshot(snapshot) -> Dict[str, Any]:
     }
 
 
+def _cache_snapshot(snapshot) -> Dict[str, Any]:
+    payload = _normalize_snapshot(snapshot)
+    indicators = {
+        "indicators": payload["indicators"],
+        "data_source": payload["data_source"],
+        "timestamp": payload["created_at"],
+    }
+    created_at = payload["created_at"]
+    # A snapshot is immutable once stored, so its id + timestamp identify the body
+    etag = f'W/"{payload["id"]}-{int(created_at.timestamp()) if created_at else 0}"'
+    entry = {
+        "snapshot_id": payload["id"],
+        "payload": payload,
+        "indicators": indicators,
+        "etag": etag,
+    }
+    get_kv_cache().set(
+        economic_crud.LATEST_SNAPSHOT_CACHE_KEY,
+        entry,
+        get_settings().economic_shared_cache_ttl_seconds,
+    )
+    return _store_local(entry)
+
+
+def _store_local(entry: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {
+        **entry,
+        "encoded": {
+            key: orjson.dumps(entry[key], option=orjson.OPT_SERIALIZE_NUMPY)
+            for key in ("payload", "indicators")
+        },
+        "expires_at": time.monotonic() + get_settings().economic_cache_ttl_seconds,
+    }
+    with _snapshot_cache_lock:
+        _snapshot_cache.update(entry)
+    return entry
+
+
+def _invalidate_snapshot_cache() -> None:
+    with _snapshot_cache_lock:
+        _snapshot_cache.update(
+            snapshot_id=None,
+            payload=None,
+            indicators=None,
+            etag=None,
+            encoded=None,
+            expires_at=0.0,
+        )
+    get_kv_cache().delete(economic_crud.LATEST_SNAPSHOT_CACHE_KEY)
+
+
+def _get_cached_snapshot(
+    db: Session, economic_service: EconomicService
+) -> Dict[str, Any]:
+    with _snapshot_cache_lock:
+        if (
+            _snapshot_cache["payload"] is not None
+            and time.monotonic() < _snapshot_cache["expires_at"]
+        ):
+            return dict(_snapshot_cache)
+        cached_id: Optional[int] = _snapshot_cache["snapshot_id"]
+
+    latest_id = economic_crud.get_latest_snapshot_id(db)
+    if latest_id is None:
+        return _cache_snapshot(_refresh_and_store(db, economic_service))
+
+    if latest_id == cached_id:
+        with _snapshot_cache_lock:
+            _snapshot_cache["expires_at"] = (
+                time.monotonic() + get_settings().economic_cache_ttl_seconds
+            )
+            return dict(_snapshot_cache)
+
+    # Another worker may already have normalized this snapshot
+    shared = get_kv_cache().get(economic_crud.LATEST_SNAPSHOT_CACHE_KEY)
+    if shared is not None and shared.get("snapshot_id") == latest_id:
+        return _store_local(shared)
+
+    return _cache_snapshot(economic_crud.get_latest_snapshot_row(db))
+
+
+def _conditional_response(request: Request, entry: Dict[str, Any], key: str):
+    """
+    Answer 304 when the client already holds this snapshot, else send the
+    pre-encoded body (skips per-request encoding of the cached dict).
+    """
+    etag = entry["etag"]
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        content=entry["encoded"][key],
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
 @router.get("/", response_model=Dict)
-def get_economic_environment(db: Session = Depends(get_db)):
+def get_economic_environment(
+    request: Request,
+    db: Session = Depends(get_db),
+    economic_service: EconomicService = Depends(get_economic_service),
+):
     try:
-        snapshot = economic_crud.get_latest_snapshot(db)
-        if not snapshot:
-            snapshot = _refresh_and_store(db)
-        return _normalize_snapshot(snapshot)
+        entry = _get_cached_snapshot(db, economic_service)
+        return _conditional_response(request, entry, "payload")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching economic data: {str(e)}"
@@ -67,17 +189,14 @@ def get_economic_environment(db: Session = Depends(get_db)):
 
 
 @router.get("/indicators", response_model=Dict)
-def get_economic_indicators(db: Session = Depends(get_db)):
+def get_economic_indicators(
+    request: Request,
+    db: Session = Depends(get_db),
+    economic_service: EconomicService = Depends(get_economic_service),
+):
     try:
-        snapshot = economic_crud.get_latest_snapshot(db)
-        if not snapshot:
-            snapshot = _refresh_and_store(db)
-        normalized = _normalize_snapshot(snapshot)
-        return {
-            "indicators": normalized["indicators"],
-            "data_source": normalized["data_source"],
-            "timestamp": normalized["created_at"],
-        }
+        entry = _get_cached_snapshot(db, economic_service)
+        return _conditional_response(request, entry, "indicators")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching indicators: {str(e)}"
@@ -85,10 +204,13 @@ def get_economic_indicators(db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=Dict)
-def refresh_economic_data(db: Session = Depends(get_db)):
+def refresh_economic_data(
+    db: Session = Depends(get_db),
+    economic_service: EconomicService = Depends(get_economic_service),
+):
     try:
-        snapshot = _refresh_and_store(db)
-        return _normalize_snapshot(snapshot)
+        snapshot = _refresh_and_store(db, economic_service)
+        return _cache_snapshot(snapshot)["payload"]
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error refreshing economic data: {str(e)}"
@@ -96,8 +218,11 @@ def refresh_economic_data(db: Session = Depends(get_db)):
 
 
 @router.get("/health", response_model=schemas.EconomicHealth)
-def check_economic_service():
-    has_api_key = bool(os.getenv("FRED_API_KEY"))
+def check_economic_service(
+    economic_service: EconomicService = Depends(get_economic_service),
+    settings: Settings = Depends(get_settings),
+):
+    has_api_key = bool(settings.fred_api_key)
     if not has_api_key:
         return {
             "status": "degraded",
@@ -105,12 +230,14 @@ def check_economic_service():
             "recommendation": "Add FRED_API_KEY to enable economic analysis",
         }
     try:
-        test_data = economic_service._fetch_latest_value("fed_funds_rate")
+        # Served from the service's observation cache within its TTL, so
+        # frequent health probes don't each call FRED
+        test_data = economic_service._fetch_latest_observation("fed_funds_rate")
         if test_data:
             return {
                 "status": "healthy",
                 "message": "FRED API connected successfully",
-                "sample_data": f"Federal Funds Rate: {test_data}%",
+                "sample_data": f"Federal Funds Rate: {test_data['value']}%",
             }
         return {
             "status": "warning",
@@ -125,8 +252,10 @@ def check_economic_service():
         }
 
 
-def _refresh_and_store(db: Session):
-    economic_data = economic_service.calculate_economic_score()
+def _refresh_and_store(db: Session, economic_service: EconomicService):
+    # An explicit refresh must hit FRED, not the service's cached result
+    economic_data = economic_service.calculate_economic_score(force=True)
     snapshot = economic_crud.save_snapshot(db, economic_data)
+    _invalidate_snapshot_cache()
     sector_rating_service.rate_all_sectors(db, snapshot)
     return snapshot
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 import app.schemas as schemas
@@ -11,14 +11,20 @@ router = APIRouter()
 service = NewsService()
 
 
-@router.get("/stocks/{stock_id}/news", response_model=List[schemas.NewsArticle])
+@router.get("/stocks/{stock_id}/news", response_model=List[schemas.NewsArticleHeadline])
 def list_news(
     stock_id: int,
     skip: int = 0,
     limit: int = 50,
+    q: Optional[str] = Query(None, min_length=2, description="Title substring"),
+    since: Optional[int] = Query(
+        None, ge=0, description="Only articles published at/after this Unix time"
+    ),
     db: Session = Depends(get_db),
 ):
-    articles = news_crud.list_news(db, stock_id, skip=skip, limit=limit)
+    articles = news_crud.list_news(
+        db, stock_id, skip=skip, limit=limit, q=q, since_ts=since
+    )
     return articles
 
 
@@ -27,6 +33,11 @@ def news_summary(stock_id: int, limit: int = 20, db: Session = Depends(get_db)):
     return news_crud.summarize_news(db, stock_id, limit)
 
 
+@router.get("/news/{article_id}", response_model=schemas.NewsArticle)
+def get_news_article(article_id: int, db: Session = Depends(get_db)):
+    return news_crud.get_article(db, article_id)
+
+
 @router.post("/stocks/news/refresh")
 def refresh_all_news(lookback_hours: int = 12, db: Session = Depends(get_db)):
     """Refresh news for all stocks; trims any previously stored articles not in the latest fetch."""
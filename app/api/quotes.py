@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 import app.schemas as schemas
 from app.services.quote import QuoteService
+from app.utils.response_cache import response_cache
 
 router = APIRouter()
 service = QuoteService()
@@ -16,4 +17,5 @@ def refresh_quote(stock_id: int, db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=404, detail="Stock not found or quote unavailable"
         )
+    response_cache.clear("stocks")
     return updated
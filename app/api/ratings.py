@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from database import get_db
 import app.schemas as schemas
 import app.crud.rating as rating_crud
+import app.crud.stock as stock_crud
 import app.services.rating as rating_service
+from app.utils.response_cache import response_cache
 
 router = APIRouter()
 
@@ -28,6 +30,22 @@ def get_rating(rating_id: int, db: Session = Depends(get_db)):
     return rating
 
 
-@router.post("/calculate/{stock_id}", response_model=schemas.Rating)
-def calculate_and_save_rating(stock_id: int, db: Session = Depends(get_db)):
-    return rating_service.calculate_and_store_rating(db, stock_id)
+def _calculate_and_invalidate(stock_id: int) -> None:
+    if rating_service.calculate_rating_in_background(stock_id):
+        response_cache.clear("stocks")
+
+
+@router.post(
+    "/calculate/{stock_id}",
+    response_model=schemas.RatingCalculationAccepted,
+    status_code=202,
+)
+def calculate_and_save_rating(
+    stock_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    """Queue a rating calculation; the new rating shows up in the stock's history."""
+    stock_crud.ensure_stock_exists(db, stock_id)
+    # Finnhub/Stooq fetches take seconds; don't hold the request (or its DB
+    # connection) open for them
+    background_tasks.add_task(_calculate_and_invalidate, stock_id)
+    return {"stock_id": stock_id}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -6,18 +6,32 @@ from database import get_db
 import app.models as models
 import app.schemas as schemas
 import app.crud.sector as sector_crud
+from app.utils.response_cache import response_cache
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[schemas.Sector])
-def list_sectors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return sector_crud.list_sectors(db, skip, limit)
+def list_sectors(
+    request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+):
+    return response_cache.respond(
+        request,
+        "sectors",
+        lambda: [
+            schemas.Sector.model_validate(sector)
+            for sector in sector_crud.list_sectors(db, skip, limit)
+        ],
+    )
 
 
 @router.get("/{sector_id}", response_model=schemas.Sector)
-def get_sector(sector_id: int, db: Session = Depends(get_db)):
-    return sector_crud.get_sector(db, sector_id)
+def get_sector(request: Request, sector_id: int, db: Session = Depends(get_db)):
+    return response_cache.respond(
+        request,
+        "sectors",
+        lambda: schemas.Sector.model_validate(sector_crud.get_sector(db, sector_id)),
+    )
 
 
 @router.get(
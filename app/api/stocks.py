@@ -1,13 +1,32 @@
-from fastapi import APIRouter, Depends, Query
+from datetime import date
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Literal, Optional
 
 from database import get_db
 import app.schemas as schemas
 import app.crud.stock as stock_crud
+from app.utils.response_cache import response_cache
 
 router = APIRouter()
 
+# Compiled once; each serializes a whole response in a single pydantic-core pass
+_STOCK_LIST_ADAPTER = TypeAdapter(List[schemas.StockWithLatestRating])
+_STOCK_ADAPTER = TypeAdapter(schemas.StockWithLatestRating)
+_HISTORY_ADAPTER = TypeAdapter(schemas.RatingHistoryResponse)
+
+
+def _json_response(adapter: TypeAdapter, value, exclude=None) -> Response:
+    # The CRUD layer already built/validated the value: encode it straight to
+    # JSON bytes (no intermediate dict) and return it so FastAPI doesn't
+    # re-validate it against response_model (kept for the OpenAPI schema)
+    return Response(
+        content=adapter.dump_json(value, exclude=exclude),
+        media_type="application/json",
+    )
+
 
 @router.get(
     "/",
@@ -15,6 +34,7 @@ router = APIRouter()
     response_model_exclude={"latest_rating": {"data_sources"}},
 )
 def list_stocks(
+    request: Request,
     skip: int = 0,
     limit: int = 10,
     sector_id: Optional[int] = None,
@@ -25,18 +45,33 @@ def list_stocks(
         "rating", description="Field to sort by"
     ),
     sort_dir: Literal["asc", "desc"] = Query("desc", description="Sort direction"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque keyset cursor from a previous page's X-Next-Cursor "
+        "header (same sort_by/sort_dir); skip is ignored when set.",
+    ),
     db: Session = Depends(get_db),
 ):
-    return stock_crud.list_stocks(
-        db=db,
-        skip=skip,
-        limit=limit,
-        sector_id=sector_id,
-        min_rating=min_rating,
-        max_rating=max_rating,
-        search=search,
-        sort_by=sort_by,
-        sort_dir=sort_dir,
+    return response_cache.respond(
+        request,
+        "stocks",
+        lambda: stock_crud.list_stocks(
+            db=db,
+            skip=skip,
+            limit=limit,
+            sector_id=sector_id,
+            min_rating=min_rating,
+            max_rating=max_rating,
+            search=search,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            cursor=cursor,
+        ),
+        exclude={"__all__": {"latest_rating": {"data_sources"}}},
+        adapter=_STOCK_LIST_ADAPTER,
+        headers_for=lambda page: (
+            {"X-Next-Cursor": page.next_cursor} if page.next_cursor else {}
+        ),
     )
 
 
@@ -46,12 +81,18 @@ def list_stocks(
     response_model_exclude={"latest_rating": {"data_sources"}},
 )
 def get_stock(stock_id: int, db: Session = Depends(get_db)):
-    return stock_crud.get_stock(db, stock_id)
+    return _json_response(
+        _STOCK_ADAPTER,
+        stock_crud.get_stock(db, stock_id),
+        exclude={"latest_rating": {"data_sources"}},
+    )
 
 
 @router.post("/", response_model=schemas.Stock)
 def create_stock(stock: schemas.StockCreate, db: Session = Depends(get_db)):
-    return stock_crud.create_stock(db, stock)
+    created = stock_crud.create_stock(db, stock)
+    response_cache.clear("stocks")
+    return created
 
 
 @router.get(
@@ -59,5 +100,28 @@ def create_stock(stock: schemas.StockCreate, db: Session = Depends(get_db)):
     response_model=schemas.RatingHistoryResponse,
     response_model_exclude={"ratings": {"__all__": {"data_sources"}}},
 )
-def get_stock_rating_history(stock_id: int, db: Session = Depends(get_db)):
-    return stock_crud.get_rating_history(db, stock_id)
+def get_stock_rating_history(
+    stock_id: int,
+    limit: int = Query(365, ge=1, le=5000),
+    since: Optional[date] = Query(None, description="Only ratings on/after this date"),
+    db: Session = Depends(get_db),
+):
+    return _json_response(
+        _HISTORY_ADAPTER,
+        stock_crud.get_rating_history(db, stock_id, limit=limit, since=since),
+        exclude={"ratings": {"__all__": {"data_sources"}}},
+    )
+
+
+@router.get("/{stock_id}/history/export", response_class=StreamingResponse)
+def export_stock_rating_history(
+    stock_id: int,
+    since: Optional[date] = Query(None, description="Only ratings on/after this date"),
+    db: Session = Depends(get_db),
+):
+    """Stream the full rating history as NDJSON (one rating per line)."""
+    stock_crud.ensure_stock_exists(db, stock_id)
+    return StreamingResponse(
+        stock_crud.iter_rating_history_ndjson(stock_id, since=since),
+        media_type="application/x-ndjson",
+    )
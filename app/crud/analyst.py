@@ -4,14 +4,7 @@ from sqlalchemy import desc
 
 import app.models as models
 import app.schemas as schemas
-
-
-def _r2(val):
-    return (
-        round(float(val), 2)
-        if isinstance(val, (int, float)) and val is not None
-        else val
-    )
+from app.utils.num import r2 as _r2
 
 
 # Granular analyst ratings
@@ -57,14 +50,12 @@ def upsert_rating(
                 )
         db.add(existing)
         db.commit()
-        db.refresh(existing)
         return existing
 
     data["target_price"] = _r2(data.get("target_price"))
     record = models.AnalystRating(**data)
     db.add(record)
     db.commit()
-    db.refresh(record)
     return record
 
 
@@ -104,12 +95,10 @@ def upsert_consensus(
                 )
         db.add(existing)
         db.commit()
-        db.refresh(existing)
         return existing
 
     data["target_mean"] = _r2(data.get("target_mean"))
     record = models.AnalystConsensus(**data)
     db.add(record)
     db.commit()
-    db.refresh(record)
     return record
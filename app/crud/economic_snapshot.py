@@ -1,8 +1,16 @@
+from sqlalchemy import Row, select
 from sqlalchemy.orm import Session
 from typing import Optional, Dict
 
 import app.models as models
 
+# Shared (Redis) cache key for the normalized latest snapshot.
+# Contract: anything that saves a snapshot deletes this key after
+# committing. Readers also compare the cached snapshot_id with the latest id
+# before serving it, so a writer that skips the delete costs an extra DB read,
+# not stale data.
+LATEST_SNAPSHOT_CACHE_KEY = "economic:latest"
+
 
 def save_snapshot(db: Session, data: Dict) -> models.EconomicSnapshot:
     snapshot = models.EconomicSnapshot(
@@ -16,7 +24,6 @@ def save_snapshot(db: Session, data: Dict) -> models.EconomicSnapshot:
     )
     db.add(snapshot)
     db.commit()
-    db.refresh(snapshot)
     return snapshot
 
 
@@ -28,6 +35,34 @@ def get_latest_snapshot(db: Session) -> Optional[models.EconomicSnapshot]:
     )
 
 
+def get_latest_snapshot_row(db: Session) -> Optional[Row]:
+    """Latest snapshot as a Row of the columns the API renders, without ORM objects."""
+    snapshot = models.EconomicSnapshot
+    return db.execute(
+        select(
+            snapshot.id,
+            snapshot.economic_score,
+            snapshot.components,
+            snapshot.indicators,
+            snapshot.indicator_context,
+            snapshot.analysis,
+            snapshot.data_source,
+            snapshot.created_at,
+        )
+        .order_by(snapshot.created_at.desc())
+        .limit(1)
+    ).first()
+
+
+def get_latest_snapshot_id(db: Session) -> Optional[int]:
+    return (
+        db.query(models.EconomicSnapshot.id)
+        .order_by(models.EconomicSnapshot.created_at.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
 def clear_snapshots(db: Session) -> None:
     db.query(models.EconomicSnapshot).delete()
     db.commit()
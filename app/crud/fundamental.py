@@ -30,5 +30,4 @@ def create(
     record = models.FundamentalIndicator(**data)
     db.add(record)
     db.commit()
-    db.refresh(record)
     return record
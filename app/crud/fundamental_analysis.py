@@ -32,10 +32,8 @@ def upsert(
         for k, v in data.items():
             setattr(existing, k, v)
         db.commit()
-        db.refresh(existing)
         return existing
     record = models.FundamentalAnalysis(**data)
     db.add(record)
     db.commit()
-    db.refresh(record)
     return record
@@ -1,25 +1,67 @@
+import csv
+import io
 from datetime import datetime
-from typing import List
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import column, desc, func, or_, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 import app.models as models
 import app.schemas as schemas
+from app.utils.num import r2 as _r2
 
-
-def _r2(val):
-    return (
-        round(float(val), 2)
-        if isinstance(val, (int, float)) and val is not None
-        else val
-    )
+# Batches larger than this are staged with COPY instead of a multi-row INSERT
+COPY_THRESHOLD = 100
+_COPY_NULL = "\\N"
+_STAGE_COLUMNS = (
+    "stock_id",
+    "title",
+    "summary",
+    "content",
+    "url",
+    "source",
+    "author",
+    "published_at",
+    "published_ts",
+    "sentiment_score",
+    "sentiment_label",
+    "category",
+    "fetched_at",
+)
 
 
 def list_news(
-    db: Session, stock_id: int, skip: int = 0, limit: int = 50
+    db: Session,
+    stock_id: int,
+    skip: int = 0,
+    limit: int = 50,
+    q: Optional[str] = None,
+    since_ts: Optional[int] = None,
 ) -> List[models.NewsArticle]:
+    # Headline columns only; summary/content can be several KB per article
+    query = db.query(models.NewsArticle)
+    if since_ts is not None:
+        query = query.filter(models.NewsArticle.published_ts >= since_ts)
+    if q:
+        # Matches the lower(title) trigram index
+        query = query.filter(
+            func.lower(models.NewsArticle.title).contains(q.lower(), autoescape=True)
+        )
     return (
-        db.query(models.NewsArticle)
+        query.options(
+            load_only(
+                models.NewsArticle.id,
+                models.NewsArticle.stock_id,
+                models.NewsArticle.title,
+                models.NewsArticle.url,
+                models.NewsArticle.source,
+                models.NewsArticle.published_at,
+                models.NewsArticle.sentiment_score,
+                models.NewsArticle.sentiment_label,
+                models.NewsArticle.category,
+            )
+        )
         .filter(models.NewsArticle.stock_id == stock_id)
         .order_by(desc(models.NewsArticle.published_at))
         .offset(skip)
@@ -28,50 +70,56 @@ def list_news(
     )
 
 
+def get_article(db: Session, article_id: int) -> models.NewsArticle:
+    article = db.get(models.NewsArticle, article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="News article not found")
+    return article
+
+
 def upsert_articles(db: Session, stock_id: int, articles: List[dict]) -> int:
-    """Insert new articles and prune stale ones for a stock in a single transaction."""
+    """
+    Upsert articles and prune stale ones for a stock in a single transaction.
+    Returns the number of articles inserted or refreshed.
+    """
     if not articles:
         return 0
 
-    inserted = 0
-    fetched_urls = {art.get("url") for art in articles if art.get("url")}
-    inserted_urls = set()
-
+    # De-duplicate within the payload, keeping the first occurrence of each URL;
+    # ON CONFLICT cannot touch the same row twice in one statement.
+    by_url = {}
     for art in articles:
         url = art.get("url")
-        if not url:
-            continue  # ignore malformed entries lacking URLs
-
-        if url in inserted_urls:
-            continue  # duplicate within the same payload
-        exists = (
-            db.query(models.NewsArticle.id)
-            .filter(
-                models.NewsArticle.url == url,
-                models.NewsArticle.stock_id == stock_id,
-            )
-            .first()
-        )
-        if exists:
-            continue  # skip duplicates for this stock
-
-        db_article = models.NewsArticle(
-            stock_id=stock_id,
-            title=art.get("title"),
-            summary=art.get("summary"),
-            content=art.get("content"),
-            url=url,
-            source=art.get("source"),
-            author=art.get("author"),
-            published_at=art.get("published_at"),
-            sentiment_score=_r2(art.get("sentiment_score")),
-            sentiment_label=art.get("sentiment_label"),
-            category=art.get("category"),
-            fetched_at=datetime.utcnow(),
-        )
-        db.add(db_article)
-        inserted += 1
-        inserted_urls.add(url)
+        if url and url not in by_url:  # ignore malformed entries lacking URLs
+            by_url[url] = art
+    fetched_urls = set(by_url)
+
+    upserted = 0
+    if by_url:
+        fetched_at = datetime.utcnow()
+        rows = [
+            {
+                "stock_id": stock_id,
+                "title": art.get("title"),
+                "summary": art.get("summary"),
+                "content": art.get("content"),
+                "url": url,
+                "source": art.get("source"),
+                "author": art.get("author"),
+                "published_at": art.get("published_at"),
+                "published_ts": art.get("published_ts"),
+                "sentiment_score": _r2(art.get("sentiment_score")),
+                "sentiment_label": art.get("sentiment_label"),
+                "category": art.get("category"),
+                "fetched_at": fetched_at,
+            }
+            for url, art in by_url.items()
+        ]
+        if len(rows) > COPY_THRESHOLD:
+            upserted = _copy_upsert(db, rows)
+        else:
+            stmt = _on_conflict_refresh(pg_insert(models.NewsArticle).values(rows))
+            upserted = db.execute(stmt).rowcount
 
     # Prune any previously stored news for this stock that wasn't returned in the latest fetch.
     if fetched_urls:
@@ -83,18 +131,85 @@ def upsert_articles(db: Session, stock_id: int, articles: List[dict]) -> int:
         )
 
     db.commit()
-    return inserted
+    return upserted
+
+
+def _on_conflict_refresh(stmt):
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["stock_id", "url"],
+        set_={
+            "summary": excluded.summary,
+            "sentiment_score": excluded.sentiment_score,
+        },
+        # Leave unchanged rows alone so rowcount only reflects real writes
+        where=or_(
+            models.NewsArticle.summary.is_distinct_from(excluded.summary),
+            models.NewsArticle.sentiment_score.is_distinct_from(
+                excluded.sentiment_score
+            ),
+        ),
+    )
+
+
+def _copy_upsert(db: Session, rows: List[dict]) -> int:
+    """COPY a large batch into a temp stage table, then merge it with one upsert."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            [_COPY_NULL if row[c] is None else row[c] for c in _STAGE_COLUMNS]
+        )
+    buffer.seek(0)
+
+    columns = ", ".join(_STAGE_COLUMNS)
+    db.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS news_stage ON COMMIT DROP AS "
+            f"SELECT {columns} FROM news_articles WITH NO DATA"
+        )
+    )
+    db.execute(text("TRUNCATE news_stage"))
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY news_stage ({columns}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+    stage = table("news_stage", *(column(c) for c in _STAGE_COLUMNS))
+    stmt = pg_insert(models.NewsArticle).from_select(
+        list(_STAGE_COLUMNS), select(*stage.c)
+    )
+    return db.execute(_on_conflict_refresh(stmt)).rowcount
 
 
 def summarize_news(db: Session, stock_id: int, limit: int = 20) -> dict:
-    articles = list_news(db, stock_id, limit=limit)
-    headlines = [a.title for a in articles]
-    sources = {}
-    for a in articles:
-        sources[a.source] = sources.get(a.source, 0) + 1
+    recent = (
+        db.query(
+            models.NewsArticle.title,
+            models.NewsArticle.source,
+            models.NewsArticle.published_at,
+        )
+        .filter(models.NewsArticle.stock_id == stock_id)
+        .order_by(desc(models.NewsArticle.published_at))
+        .limit(limit)
+    )
+    headlines = recent.with_entities(
+        models.NewsArticle.title, models.NewsArticle.published_at
+    ).all()
+
+    # Count sources over the same window of latest articles in the database
+    window = recent.subquery()
+    sources = dict(
+        db.query(window.c.source, func.count()).group_by(window.c.source).all()
+    )
     return {
-        "count": len(articles),
-        "headlines": headlines,
+        "count": len(headlines),
+        "headlines": [title for title, _ in headlines],
         "sources": sources,
-        "latest_published_at": articles[0].published_at if articles else None,
+        "latest_published_at": headlines[0].published_at if headlines else None,
     }
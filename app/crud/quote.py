@@ -1,4 +1,5 @@
-from typing import List
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
 import app.models as models
 
@@ -8,9 +9,39 @@ def update_quote(db: Session, stock: models.Stock, price: float, market_cap: flo
     stock.market_cap = round(float(market_cap), 2) if market_cap is not None else None
     db.add(stock)
     db.commit()
-    db.refresh(stock)
     return stock
 
 
-def list_stocks(db: Session) -> List[models.Stock]:
-    return db.query(models.Stock).all()
+def iter_stock_symbols(db: Session, batch_size: int = 500) -> Iterator[Tuple[int, str]]:
+    """Stream (stock_id, symbol) rows through a server-side cursor; no ORM objects."""
+    return db.execute(
+        select(models.Stock.id, models.Stock.symbol).execution_options(
+            yield_per=batch_size
+        )
+    )
+
+
+def bulk_update_quotes(
+    db: Session, quotes: List[Tuple[int, Optional[float], Optional[float]]]
+) -> int:
+    """Apply (stock_id, price, market_cap) tuples in one executemany round-trip."""
+    if not quotes:
+        return 0
+    stocks = models.Stock.__table__
+    db.execute(
+        update(stocks)
+        .where(stocks.c.id == bindparam("b_id"))
+        .values(current_price=bindparam("b_price"), market_cap=bindparam("b_cap")),
+        [
+            {
+                "b_id": stock_id,
+                "b_price": price,
+                "b_cap": (
+                    round(float(market_cap), 2) if market_cap is not None else None
+                ),
+            }
+            for stock_id, price, market_cap in quotes
+        ],
+    )
+    db.commit()
+    return len(quotes)
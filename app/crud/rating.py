@@ -1,33 +1,91 @@
 from fastapi import HTTPException
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, desc, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, raiseload
 from typing import List, Optional
 
 import app.models as models
 import app.schemas as schemas
 
+# Built once at import; per-request values are bound at execute time.
+# schemas.Rating has no nested relationships, so any lazy load while
+# serializing the page would be an accidental N+1: raise instead.
+_RATINGS_PAGE = (
+    select(models.Rating)
+    .options(raiseload("*"))
+    .order_by(desc(models.Rating.rating_date))
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+_RATINGS_PAGE_BY_STOCK = _RATINGS_PAGE.where(
+    models.Rating.stock_id == bindparam("stock_id")
+)
+
 
 def list_ratings(
     db: Session, skip: int = 0, limit: int = 100, stock_id: Optional[int] = None
 ) -> List[models.Rating]:
-    query = db.query(models.Rating)
     if stock_id:
-        query = query.filter(models.Rating.stock_id == stock_id)
-    return (
-        query.order_by(desc(models.Rating.rating_date)).offset(skip).limit(limit).all()
-    )
+        stmt, params = _RATINGS_PAGE_BY_STOCK, {"stock_id": stock_id}
+    else:
+        stmt, params = _RATINGS_PAGE, {}
+    return db.scalars(stmt, {**params, "skip": skip, "limit": limit}).all()
 
 
 def get_rating(db: Session, rating_id: int) -> models.Rating:
-    rating = db.query(models.Rating).filter(models.Rating.id == rating_id).first()
-    if not rating:
+    rating = db.get(models.Rating, rating_id)
+    if rating is None:
         raise HTTPException(status_code=404, detail="Rating not found")
     return rating
 
 
 def create_rating(db: Session, payload: schemas.RatingCreate) -> models.Rating:
-    rating = models.Rating(**payload.model_dump())
-    db.add(rating)
+    # INSERT ... RETURNING hands back the row with its id and server defaults in
+    # one round trip; the stock_id foreign key doubles as the existence check
+    try:
+        rating = db.scalars(
+            insert(models.Rating).returning(models.Rating), [payload.model_dump()]
+        ).one()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Stock not found")
+    set_latest_rating(db, rating)
     db.commit()
-    db.refresh(rating)
     return rating
+
+
+def set_latest_rating(db: Session, rating: models.Rating) -> None:
+    """Point the stock at a newly inserted (flushed) rating and store its trend."""
+    # Lock the stock row (and reload it, ignoring any stale copy in the session)
+    # so overlapping inserts for the same stock apply their pointer updates one
+    # after the other. NO KEY UPDATE doesn't conflict with the KEY SHARE lock
+    # the rating INSERT's foreign key check already holds.
+    stock = db.scalars(
+        select(models.Stock)
+        .where(models.Stock.id == rating.stock_id)
+        .with_for_update(key_share=True)
+        .execution_options(populate_existing=True)
+    ).one_or_none()
+    if stock is None:
+        return
+    previous = (
+        db.get(models.Rating, stock.latest_rating_id)
+        if stock.latest_rating_id
+        else None
+    )
+    stock.prev_rating_id = stock.latest_rating_id
+    stock.latest_rating_id = rating.id
+    stock.rating_trend = rating_trend(
+        rating.overall_rating,
+        previous.overall_rating if previous is not None else None,
+    )
+
+
+def rating_trend(current: float, previous: Optional[float]) -> str:
+    if previous is None:
+        return "new"
+    if current > previous:
+        return "up"
+    if current < previous:
+        return "down"
+    return "stable"
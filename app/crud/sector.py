@@ -1,16 +1,22 @@
 from fastapi import HTTPException
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from typing import List
 
 import app.models as models
 
+# Built once at import; per-request values are bound at execute time
+_SECTORS_PAGE = (
+    select(models.Sector).offset(bindparam("skip")).limit(bindparam("limit"))
+)
+
 
 def list_sectors(db: Session, skip: int = 0, limit: int = 100) -> List[models.Sector]:
-    return db.query(models.Sector).offset(skip).limit(limit).all()
+    return db.scalars(_SECTORS_PAGE, {"skip": skip, "limit": limit}).all()
 
 
 def get_sector(db: Session, sector_id: int) -> models.Sector:
-    sector = db.query(models.Sector).filter(models.Sector.id == sector_id).first()
-    if not sector:
+    sector = db.get(models.Sector, sector_id)
+    if sector is None:
         raise HTTPException(status_code=404, detail="Sector not found")
     return sector
@@ -1,10 +1,43 @@
+from datetime import date, datetime
 from fastapi import HTTPException
-from sqlalchemy import asc, desc, func, or_
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-
+from sqlalchemy import and_, asc, desc, func, or_, select
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from typing import Any, Iterator, NamedTuple, Optional, Tuple
+import base64
+import orjson
+
+from config import get_settings
+from database import SessionLocal
 import app.models as models
 import app.schemas as schemas
+from app.utils.num import r2 as _r2
+
+
+def _eager(*options):
+    """
+    Loader options for a stock query, plus raiseload("*") when
+    STRICT_RELATIONSHIPS is set so any relationship not loaded here raises.
+    """
+    if get_settings().strict_relationships:
+        return (*options, raiseload("*"))
+    return options
+
+
+# Sort columns for the stock list; every order is (column NULLS LAST, id) so a
+# page boundary is a unique (value, id) position that a cursor can resume from
+_SORT_COLUMNS = {
+    "rating": models.Rating.overall_rating,
+    "market_cap": models.Stock.market_cap,
+    "symbol": models.Stock.symbol,
+    "name": models.Stock.name,
+    "created_at": models.Stock.created_at,
+}
+
+
+class StockList(list):
+    """A page of stocks plus the opaque cursor for the next page (None if last)."""
+
+    next_cursor: Optional[str] = None
 
 
 def list_stocks(
@@ -17,30 +50,16 @@ def list_stocks(
     search: Optional[str],
     sort_by: str = "name",
     sort_dir: str = "asc",
-) -> List[schemas.StockWithLatestRating]:
-    # Subquery: one row per stock with its latest rating date and overall_rating
-    latest_date_sq = (
-        db.query(
-            models.Rating.stock_id,
-            func.max(models.Rating.rating_date).label("latest_date"),
-        )
-        .group_by(models.Rating.stock_id)
-        .subquery()
-    )
-    latest_rating_sq = (
-        db.query(models.Rating)
-        .join(
-            latest_date_sq,
-            (models.Rating.stock_id == latest_date_sq.c.stock_id)
-            & (models.Rating.rating_date == latest_date_sq.c.latest_date),
-        )
-        .subquery()
-    )
-
+    cursor: Optional[str] = None,
+) -> StockList:
+    # Each stock paired with only its latest rating row, via the denormalized
+    # pointer kept up to date by crud.rating.set_latest_rating.
+    # selectinload fetches each distinct sector once with an IN query rather
+    # than repeating its columns on every stock row of the page
     query = (
-        db.query(models.Stock)
-        .options(joinedload(models.Stock.sector), joinedload(models.Stock.ratings))
-        .outerjoin(latest_rating_sq, models.Stock.id == latest_rating_sq.c.stock_id)
+        db.query(models.Stock, models.Rating)
+        .options(*_eager(selectinload(models.Stock.sector)))
+        .outerjoin(models.Stock.latest_rating)
     )
 
     if sector_id:
@@ -55,112 +74,174 @@ def list_stocks(
         )
 
     if min_rating is not None:
-        query = query.filter(latest_rating_sq.c.overall_rating >= min_rating)
+        query = query.filter(models.Rating.overall_rating >= min_rating)
     if max_rating is not None:
-        query = query.filter(latest_rating_sq.c.overall_rating <= max_rating)
+        query = query.filter(models.Rating.overall_rating <= max_rating)
+
+    if sort_by not in _SORT_COLUMNS:
+        sort_by = "name"
+    column = _SORT_COLUMNS[sort_by]
+    descending = sort_dir == "desc"
+    direction = desc if descending else asc
+
+    if cursor is not None:
+        # Keyset page: resume after the last row of the previous page instead
+        # of scanning and discarding skip rows
+        value, last_id = _decode_cursor(cursor, sort_by, sort_dir)
+        query = query.filter(_after(column, descending, value, last_id))
+        skip = 0
+
+    query = query.order_by(direction(column).nullslast(), direction(models.Stock.id))
+
+    rows = [
+        _StockRow(stock, latest_rating)
+        for stock, latest_rating in query.offset(skip).limit(limit).all()
+    ]
+
+    # Rows come straight from the database and are already typed, so build the
+    # response models with model_construct instead of re-validating every field.
+    page = StockList(_construct_stock(row) for row in rows)
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        page.next_cursor = _encode_cursor(
+            sort_by, sort_dir, _sort_value(last, sort_by), last.stock.id
+        )
+    return page
+
+
+def _after(column, descending: bool, value: Any, last_id: int):
+    """Rows strictly after (value, last_id) in (column NULLS LAST, id) order."""
+    id_after = models.Stock.id < last_id if descending else models.Stock.id > last_id
+    if value is None:
+        # Already inside the trailing NULL block: only the id decides
+        return and_(column.is_(None), id_after)
+    beyond = column < value if descending else column > value
+    return or_(beyond, and_(column == value, id_after), column.is_(None))
 
-    direction = desc if sort_dir == "desc" else asc
+
+def _sort_value(row: "_StockRow", sort_by: str) -> Any:
+    # The raw column value: the response rounds ratings, which would skip rows
     if sort_by == "rating":
-        query = query.order_by(direction(latest_rating_sq.c.overall_rating).nullslast())
-    elif sort_by == "market_cap":
-        query = query.order_by(direction(models.Stock.market_cap).nullslast())
-    elif sort_by == "symbol":
-        query = query.order_by(direction(models.Stock.symbol))
-    elif sort_by == "created_at":
-        query = query.order_by(direction(models.Stock.created_at))
-    else:
-        query = query.order_by(direction(models.Stock.name))
-
-    stocks = query.offset(skip).limit(limit).all()
-
-    result = []
-    for stock in stocks:
-        stock_dict = schemas.Stock.model_validate(stock).model_dump()
-
-        if stock.ratings:
-            sorted_ratings = sorted(
-                stock.ratings, key=lambda r: r.rating_date, reverse=True
+        return row.latest_rating.overall_rating if row.latest_rating else None
+    return getattr(row.stock, sort_by)
+
+
+def _encode_cursor(sort_by: str, sort_dir: str, value: Any, stock_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = orjson.dumps([sort_by, sort_dir, value, stock_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_dir: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_dir, value, stock_id = orjson.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (cursor_sort, cursor_dir) != (sort_by, sort_dir):
+        raise HTTPException(
+            status_code=400, detail="Cursor does not match this sort order"
+        )
+    # The value is compared against the sort column in SQL, so a tampered
+    # cursor must fail here rather than as a database type error
+    value = _parse_sort_value(sort_by, value)
+    if not isinstance(stock_id, int) or isinstance(stock_id, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, stock_id
+
+
+def _parse_sort_value(sort_by: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if sort_by in ("rating", "market_cap") and _is_number(value):
+        return value
+    if sort_by in ("symbol", "name") and isinstance(value, str):
+        return value
+    if sort_by == "created_at" and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _StockRow(NamedTuple):
+    stock: models.Stock
+    latest_rating: Optional[models.Rating]
+
+
+_SCORE_FIELDS = (
+    "overall_rating",
+    "technical_score",
+    "analyst_score",
+    "fundamental_score",
+    "economic_score",
+)
+
+
+def _construct_stock(row: _StockRow) -> schemas.StockWithLatestRating:
+    return schemas.StockWithLatestRating.model_construct(
+        **_stock_fields(row.stock),
+        latest_rating=_construct_rating(row.latest_rating),
+        rating_trend=(
+            row.stock.rating_trend if row.latest_rating is not None else None
+        ),
+    )
+
+
+def _stock_fields(stock: models.Stock) -> dict:
+    sector = stock.sector
+    return {
+        "id": stock.id,
+        "symbol": stock.symbol,
+        "name": stock.name,
+        "sector_id": stock.sector_id,
+        "market_cap": stock.market_cap,
+        "current_price": stock.current_price,
+        "created_at": stock.created_at,
+        "updated_at": stock.updated_at,
+        "sector": (
+            schemas.Sector.model_construct(
+                id=sector.id, name=sector.name, description=sector.description
             )
-            latest_rating = sorted_ratings[0]
-
-            rating_dict = schemas.Rating.model_validate(latest_rating).model_dump()
-            for k in [
-                "overall_rating",
-                "technical_score",
-                "analyst_score",
-                "fundamental_score",
-                "economic_score",
-            ]:
-                if k in rating_dict:
-                    rating_dict[k] = _r2(rating_dict[k])
-            stock_dict["latest_rating"] = rating_dict
-
-            if len(sorted_ratings) >= 2:
-                curr, prev = (
-                    sorted_ratings[0].overall_rating,
-                    sorted_ratings[1].overall_rating,
-                )
-                if curr > prev:
-                    stock_dict["rating_trend"] = "up"
-                elif curr < prev:
-                    stock_dict["rating_trend"] = "down"
-                else:
-                    stock_dict["rating_trend"] = "stable"
-            else:
-                stock_dict["rating_trend"] = "new"
-        else:
-            stock_dict["latest_rating"] = None
-            stock_dict["rating_trend"] = None
-
-        result.append(schemas.StockWithLatestRating(**stock_dict))
-
-    return result
+            if sector is not None
+            else None
+        ),
+    }
+
+
+def _construct_rating(rating: Optional[models.Rating]) -> Optional[schemas.Rating]:
+    if rating is None:
+        return None
+    fields = {k: _r2(getattr(rating, k)) for k in _SCORE_FIELDS}
+    return schemas.Rating.model_construct(
+        id=rating.id,
+        stock_id=rating.stock_id,
+        rating_date=rating.rating_date,
+        data_sources=rating.data_sources,
+        notes=rating.notes,
+        **fields,
+    )
 
 
 def get_stock(db: Session, stock_id: int) -> schemas.StockWithLatestRating:
-    stock = (
-        db.query(models.Stock)
-        .options(joinedload(models.Stock.sector), joinedload(models.Stock.ratings))
+    row = (
+        db.query(models.Stock, models.Rating)
+        .options(*_eager(joinedload(models.Stock.sector)))
+        .outerjoin(models.Stock.latest_rating)
         .filter(models.Stock.id == stock_id)
         .first()
     )
 
-    if not stock:
+    if not row:
         raise HTTPException(status_code=404, detail="Stock not found")
 
-    stock_dict = schemas.Stock.from_orm(stock).dict()
-
-    if stock.ratings:
-        latest_rating = max(stock.ratings, key=lambda r: r.rating_date)
-        rd = schemas.Rating.from_orm(latest_rating).dict()
-        for k in [
-            "overall_rating",
-            "technical_score",
-            "analyst_score",
-            "fundamental_score",
-            "economic_score",
-        ]:
-            if k in rd:
-                rd[k] = _r2(rd[k])
-        stock_dict["latest_rating"] = rd
-
-        if len(stock.ratings) >= 2:
-            sorted_ratings = sorted(
-                stock.ratings, key=lambda r: r.rating_date, reverse=True
-            )
-            if sorted_ratings[0].overall_rating > sorted_ratings[1].overall_rating:
-                stock_dict["rating_trend"] = "up"
-            elif sorted_ratings[0].overall_rating < sorted_ratings[1].overall_rating:
-                stock_dict["rating_trend"] = "down"
-            else:
-                stock_dict["rating_trend"] = "stable"
-        else:
-            stock_dict["rating_trend"] = "new"
-    else:
-        stock_dict["latest_rating"] = None
-        stock_dict["rating_trend"] = None
-
-    return schemas.StockWithLatestRating(**stock_dict)
+    return _construct_stock(_StockRow(*row))
 
 
 def create_stock(db: Session, stock: schemas.StockCreate) -> models.Stock:
@@ -175,34 +256,73 @@ def create_stock(db: Session, stock: schemas.StockCreate) -> models.Stock:
     db_stock = models.Stock(**stock.model_dump())
     db.add(db_stock)
     db.commit()
-    db.refresh(db_stock)
     return db_stock
 
 
-def get_rating_history(db: Session, stock_id: int) -> schemas.RatingHistoryResponse:
-    stock = (
-        db.query(models.Stock)
-        .options(joinedload(models.Stock.sector))
-        .filter(models.Stock.id == stock_id)
-        .first()
+def get_rating_history(
+    db: Session,
+    stock_id: int,
+    limit: int = 365,
+    since: Optional[date] = None,
+) -> schemas.RatingHistoryResponse:
+    stock = db.get(
+        models.Stock, stock_id, options=_eager(selectinload(models.Stock.sector))
     )
 
     if not stock:
         raise HTTPException(status_code=404, detail="Stock not found")
 
-    ratings = (
+    query = (
         db.query(models.Rating)
+        .options(*_eager())
         .filter(models.Rating.stock_id == stock_id)
-        .order_by(desc(models.Rating.rating_date))
-        .all()
     )
+    if since is not None:
+        query = query.filter(models.Rating.rating_date >= since)
 
-    return schemas.RatingHistoryResponse(stock=stock, ratings=ratings)
+    total_count = query.with_entities(func.count(models.Rating.id)).scalar()
+    ratings = query.order_by(desc(models.Rating.rating_date)).limit(limit).all()
+
+    return schemas.RatingHistoryResponse(
+        stock=stock, ratings=ratings, total_count=total_count
+    )
 
 
-def _r2(val):
-    return (
-        round(float(val), 2)
-        if isinstance(val, (int, float)) and val is not None
-        else val
+def ensure_stock_exists(db: Session, stock_id: int) -> None:
+    if db.get(models.Stock, stock_id) is None:
+        raise HTTPException(status_code=404, detail="Stock not found")
+
+
+def iter_rating_history_ndjson(
+    stock_id: int, since: Optional[date] = None, batch_size: int = 500
+) -> Iterator[bytes]:
+    """
+    Yield a stock's ratings as NDJSON lines for bulk export.
+    Opens its own session: FastAPI closes request-scoped sessions before a
+    StreamingResponse body is iterated.
+    """
+    stmt = (
+        select(
+            models.Rating.id,
+            models.Rating.stock_id,
+            models.Rating.overall_rating,
+            models.Rating.technical_score,
+            models.Rating.analyst_score,
+            models.Rating.fundamental_score,
+            models.Rating.economic_score,
+            models.Rating.rating_date,
+            models.Rating.notes,
+        )
+        .where(models.Rating.stock_id == stock_id)
+        .order_by(desc(models.Rating.rating_date))
+        .execution_options(yield_per=batch_size)
     )
+    if since is not None:
+        stmt = stmt.where(models.Rating.rating_date >= since)
+
+    db = SessionLocal()
+    try:
+        for row in db.execute(stmt):
+            yield orjson.dumps(row._asdict()) + b"\n"
+    finally:
+        db.close()
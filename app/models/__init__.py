@@ -1,6 +1,7 @@
 from sqlalchemy import (
     Column,
     Integer,
+    BigInteger,
     String,
     Float,
     DateTime,
@@ -9,9 +10,11 @@ from sqlalchemy import (
     JSON,
     Index,
     UniqueConstraint,
+    DDL,
+    event,
+    func,
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 
 from database import Base
@@ -36,18 +39,44 @@ class Sector(Base):
 class Stock(Base):
     __tablename__ = "stocks"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
+    # unique + index builds a single unique index (ix_stocks_symbol)
     symbol = Column(String, unique=True, index=True)
     name = Column(String, index=True)
-    sector_id = Column(Integer, ForeignKey("sectors.id"), nullable=True)
+    sector_id = Column(Integer, ForeignKey("sectors.id"), nullable=True, index=True)
     market_cap = Column(Float, nullable=True)
     current_price = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized pointers maintained on rating insert (see crud.rating.set_latest_rating)
+    latest_rating_id = Column(
+        Integer,
+        ForeignKey(
+            "ratings.id",
+            use_alter=True,
+            name="fk_stocks_latest_rating_id",
+            ondelete="SET NULL",
+        ),
+        nullable=True,
+    )
+    prev_rating_id = Column(
+        Integer,
+        ForeignKey(
+            "ratings.id",
+            use_alter=True,
+            name="fk_stocks_prev_rating_id",
+            ondelete="SET NULL",
+        ),
+        nullable=True,
+    )
+    rating_trend = Column(String(10), nullable=True)
 
     sector = relationship("Sector", back_populates="stocks")
     ratings = relationship(
-        "Rating", back_populates="stock", cascade="all, delete-orphan"
+        "Rating",
+        back_populates="stock",
+        cascade="all, delete-orphan",
+        foreign_keys="Rating.stock_id",
     )
     technical_indicators = relationship(
         "TechnicalIndicator", cascade="all, delete-orphan"
@@ -61,6 +90,30 @@ class Stock(Base):
     news_articles = relationship(
         "NewsArticle", back_populates="stock", cascade="all, delete-orphan"
     )
+    # Read-side views of the denormalized pointers: one indexed PK lookup each
+    # instead of scanning ratings. Writes go through the *_rating_id columns
+    # (see crud.rating.set_latest_rating), hence viewonly.
+    latest_rating = relationship(
+        "Rating", foreign_keys=[latest_rating_id], viewonly=True
+    )
+    prev_rating = relationship("Rating", foreign_keys=[prev_rating_id], viewonly=True)
+
+    # Trigram indexes for the list search (symbol/name ILIKE '%q%'), which a
+    # btree can't serve because of the leading wildcard; needs pg_trgm
+    __table_args__ = (
+        Index(
+            "idx_stocks_symbol_trgm",
+            symbol,
+            postgresql_using="gin",
+            postgresql_ops={"symbol": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_stocks_name_trgm",
+            name,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
 
 class Rating(Base):
@@ -79,7 +132,25 @@ class Rating(Base):
     data_sources = Column(JSON, nullable=True)
     notes = Column(Text, nullable=True)
 
-    stock = relationship("Stock", back_populates="ratings")
+    stock = relationship("Stock", back_populates="ratings", foreign_keys=[stock_id])
+
+    # Latest-rating lookups filter by stock and order by date descending; the
+    # INCLUDE columns let per-stock score scans run as index-only scans
+    __table_args__ = (
+        Index(
+            "idx_rating_stock_date_cover",
+            "stock_id",
+            rating_date.desc(),
+            postgresql_include=[
+                "id",
+                "overall_rating",
+                "technical_score",
+                "analyst_score",
+                "fundamental_score",
+                "economic_score",
+            ],
+        ),
+    )
 
 
 class EconomicSnapshot(Base):
@@ -196,18 +267,21 @@ class AnalystConsensus(Base):
 class NewsArticle(Base):
     __tablename__ = "news_articles"
 
-    id = Column(Integer, primary_key=True, index=True)
-    stock_id = Column(Integer, ForeignKey("stocks.id"), index=True)
+    id = Column(Integer, primary_key=True)
+    # Lookups by stock use the idx_stock_date / uq_news_stock_url prefixes
+    stock_id = Column(Integer, ForeignKey("stocks.id"))
 
     title = Column(String(500), nullable=False)
     summary = Column(Text, nullable=True)
     content = Column(Text, nullable=True)
     url = Column(String(1000), index=True)
 
-    source = Column(String(100), index=True)
+    source = Column(String(100))
     author = Column(String(200), nullable=True)
 
-    published_at = Column(DateTime, index=True)
+    published_at = Column(DateTime)
+    # Unix seconds copy of published_at for cheap range filters (BRIN-indexed)
+    published_ts = Column(BigInteger)
     fetched_at = Column(DateTime, default=datetime.utcnow)
 
     sentiment_score = Column(Float, nullable=True)
@@ -215,15 +289,32 @@ class NewsArticle(Base):
 
     category = Column(String(50), nullable=True, index=True)
 
-    search_vector = Column(TSVECTOR)
-
     stock = relationship("Stock", back_populates="news_articles")
 
     __table_args__ = (
         Index("idx_stock_date", "stock_id", "published_at"),
-        Index("idx_source_date", "source", "published_at"),
+        # Rows arrive roughly in publish order, so a BRIN index covers
+        # date-range scans at a fraction of a B-tree's size and write cost
+        Index(
+            "idx_news_published_ts_brin",
+            "published_ts",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
         Index("idx_sentiment", "sentiment_label", "sentiment_score"),
-        Index("idx_search", "search_vector", postgresql_using="gin"),
+        # Trigram indexes for substring search (lower(title) LIKE '%q%'); needs pg_trgm
+        Index(
+            "idx_news_title_trgm",
+            func.lower(title).label("title_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"title_lower": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_news_source_trgm",
+            source,
+            postgresql_using="gin",
+            postgresql_ops={"source": "gin_trgm_ops"},
+        ),
         # Allow the same article URL to be linked to multiple stocks but prevent duplicates per stock.
         UniqueConstraint("stock_id", "url", name="uq_news_stock_url"),
     )
@@ -260,3 +351,9 @@ class SectorEconomicRating(Base):
     economic_snapshot = relationship("EconomicSnapshot")
 
     __table_args__ = (Index("idx_ser_sector_rated", "sector_id", "rated_at"),)
+
+
+# Trigram operator classes used by the news and stock search indexes
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
@@ -218,6 +218,25 @@ class NewsArticle(NewsArticleBase):
         from_attributes = True
 
 
+class NewsArticleHeadline(BaseModel):
+    """List view of a news article; fetch /news/{id} for summary and content."""
+
+    id: int
+    stock_id: int
+    title: str
+    url: str
+    source: Optional[str] = None
+    published_at: datetime
+    sentiment_score: Optional[float] = None
+    sentiment_label: Optional[Literal["positive", "negative", "neutral"]] = None
+    category: Optional[
+        Literal["earnings", "merger", "product", "guidance", "general", "company"]
+    ] = None
+
+    class Config:
+        from_attributes = True
+
+
 class NewsSummary(BaseModel):
     count: int
     headlines: List[str]
@@ -289,9 +308,16 @@ class StockFilter(BaseModel):
     search: Optional[str] = None
 
 
+class RatingCalculationAccepted(BaseModel):
+    stock_id: int
+    status: Literal["accepted"] = "accepted"
+
+
 class RatingHistoryResponse(BaseModel):
     stock: Stock
     ratings: List[Rating]
+    # Ratings matching the filters before the limit was applied
+    total_count: int
 
 
 # Economic Schemas
@@ -5,19 +5,15 @@ from sqlalchemy.orm import Session
 
 import app.models as models
 import app.crud.analyst as analyst_crud
-from app.utils.rating_utils import FinnhubClient
-from config import get_settings
+from app.utils.rating_utils import get_finnhub_client
 
 
 class AnalystService:
     def __init__(self, finnhub_api_key: Optional[str] = None):
-        settings = get_settings()
-        self.client = FinnhubClient(
-            finnhub_api_key or settings.finnhub_api_key, max_per_minute=55
-        )
+        self.client = get_finnhub_client(finnhub_api_key)
 
     def refresh_for_stock(self, db: Session, stock_id: int) -> dict:
-        stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
+        stock = db.get(models.Stock, stock_id)
         if not stock:
             raise HTTPException(status_code=404, detail="Stock not found")
 
@@ -19,24 +19,20 @@ from app.services.pillar_rating import (
     PillarValidator,
     StockContext,
 )
-from app.utils.rating_utils import FinnhubClient
-from config import get_settings
+from app.utils.rating_utils import get_finnhub_client
 
 logger = logging.getLogger(__name__)
 
 
 class FundamentalService:
     def __init__(self, finnhub_api_key: Optional[str] = None, ttl_hours: int = 24):
-        settings = get_settings()
-        self.client = FinnhubClient(
-            finnhub_api_key or settings.finnhub_api_key, max_per_minute=55
-        )
+        self.client = get_finnhub_client(finnhub_api_key)
         self.ttl_hours = ttl_hours
 
     def refresh_for_stock(
         self, db: Session, stock_id: int, force_refresh: bool = False
     ) -> models.FundamentalIndicator:
-        stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
+        stock = db.get(models.Stock, stock_id)
         if not stock:
             raise HTTPException(status_code=404, detail="Stock not found")
 
@@ -185,29 +181,28 @@ class FundamentalService:
         if not stock or stock.sector_id is None:
             return [], None
 
-        sector = db.query(models.Sector).filter_by(id=stock.sector_id).first()
+        sector = db.get(models.Sector, stock.sector_id)
         sector_name = sector.name if sector else None
 
-        peer_stocks = (
-            db.query(models.Stock)
+        # Latest indicator per peer in one DISTINCT ON query instead of one per peer
+        latest_raw_metrics = (
+            db.query(models.FundamentalIndicator.raw_metrics)
+            .join(models.Stock, models.Stock.id == models.FundamentalIndicator.stock_id)
             .filter(
                 models.Stock.sector_id == stock.sector_id,
                 models.Stock.id != stock_id,
             )
+            .distinct(models.FundamentalIndicator.stock_id)
+            .order_by(
+                models.FundamentalIndicator.stock_id,
+                models.FundamentalIndicator.fetched_at.desc(),
+            )
             .all()
         )
 
         peer_metrics: List[Dict[str, Optional[float]]] = []
-        for peer in peer_stocks:
-            fi = (
-                db.query(models.FundamentalIndicator)
-                .filter_by(stock_id=peer.id)
-                .order_by(models.FundamentalIndicator.fetched_at.desc())
-                .first()
-            )
-            if fi is None:
-                continue
-            raw = fi.raw_metrics or {}
+        for (raw_metrics,) in latest_raw_metrics:
+            raw = raw_metrics or {}
             peer_metrics.append(
                 {
                     "pe_ratio": self._first_metric(
@@ -4,36 +4,37 @@ from sqlalchemy.orm import Session
 
 import app.models as models
 import app.crud.news as news_crud
-from app.utils.rating_utils import FinnhubClient
-from config import get_settings
+from app.utils.rating_utils import get_finnhub_client
 
 
 class NewsService:
     def __init__(self, finnhub_api_key: str | None = None):
-        settings = get_settings()
-        self.client = FinnhubClient(
-            finnhub_api_key or settings.finnhub_api_key, max_per_minute=55
-        )
+        self.client = get_finnhub_client(finnhub_api_key)
 
     def fetch_and_store_company_news(
         self, db: Session, stock_id: int, lookback_hours: int = 12
     ):
-        stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
+        stock = db.get(models.Stock, stock_id)
         if not stock:
             raise HTTPException(status_code=404, detail="Stock not found")
+        symbol = stock.symbol
+        # End the read transaction so the pooled connection isn't held during the HTTP call
+        db.commit()
 
-        articles = self._fetch_company_news_data(stock.symbol, lookback_hours)
+        articles = self._fetch_company_news_data(symbol, lookback_hours)
         return news_crud.upsert_articles(db, stock_id, articles)
 
     def fetch_and_store_all_company_news(
         self, db: Session, lookback_hours: int = 12
     ) -> dict:
-        stocks = db.query(models.Stock).all()
+        stocks = db.query(models.Stock.id, models.Stock.symbol).all()
+        # upsert_articles commits per stock, so no connection is held while fetching
+        db.commit()
         total_inserted = 0
 
-        for stock in stocks:
-            articles = self._fetch_company_news_data(stock.symbol, lookback_hours)
-            total_inserted += news_crud.upsert_articles(db, stock.id, articles)
+        for stock_id, symbol in stocks:
+            articles = self._fetch_company_news_data(symbol, lookback_hours)
+            total_inserted += news_crud.upsert_articles(db, stock_id, articles)
 
         return {"stocks_processed": len(stocks), "inserted": total_inserted}
 
@@ -56,7 +57,8 @@ class NewsService:
 
         articles = []
         for item in data:
-            published = datetime.utcfromtimestamp(item["datetime"])
+            published_ts = int(item["datetime"])
+            published = datetime.utcfromtimestamp(published_ts)
             articles.append(
                 {
                     "title": item.get("headline"),
@@ -66,6 +68,7 @@ class NewsService:
                     "source": item.get("source"),
                     "author": None,
                     "published_at": published,
+                    "published_ts": published_ts,
                     "sentiment_score": None,
                     "sentiment_label": None,
                     "category": self._normalize_category(item.get("category")),
@@ -1,44 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 import app.crud.quote as quote_crud
 import app.models as models
-from app.utils.rating_utils import FinnhubClient
-from config import get_settings
+from app.utils.kv_cache import get_kv_cache
+from app.utils.rating_utils import get_finnhub_client
 
 
 class QuoteService:
+    # Finnhub calls are I/O bound; the client's throttle still caps the total rate
+    MAX_FETCH_WORKERS = 4
+    # Quotes move intraday; market cap on the profile changes about once a day
+    QUOTE_TTL_SECONDS = 30
+    PROFILE_TTL_SECONDS = 86400
+
     def __init__(self, finnhub_api_key: Optional[str] = None):
-        settings = get_settings()
-        self.client = FinnhubClient(
-            finnhub_api_key or settings.finnhub_api_key, max_per_minute=55
-        )
+        self.client = get_finnhub_client(finnhub_api_key)
+        self.cache = get_kv_cache()
 
     def refresh_all_quotes(self, db: Session):
-        updated = 0
-        stocks = quote_crud.list_stocks(db)
-        for stock in stocks:
-            price, market_cap = self._fetch_quote_and_cap(stock.symbol)
-            if price is None and market_cap is None:
-                continue
-            quote_crud.update_quote(db, stock, price, market_cap)
-            updated += 1
+        stocks = [tuple(row) for row in quote_crud.iter_stock_symbols(db)]
+        # Release the pooled connection while quotes are fetched over HTTP
+        db.commit()
+        with ThreadPoolExecutor(max_workers=self.MAX_FETCH_WORKERS) as pool:
+            fetched = pool.map(
+                self._fetch_quote_and_cap,
+                [symbol for _, symbol in stocks],
+            )
+            quotes = [
+                (stock_id, price, market_cap)
+                for (stock_id, _), (price, market_cap) in zip(stocks, fetched)
+                if price is not None or market_cap is not None
+            ]
+        updated = quote_crud.bulk_update_quotes(db, quotes)
         return {"updated": updated, "timestamp": datetime.utcnow()}
 
     def refresh_quote(self, db: Session, stock_id: int):
-        stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
+        stock = db.get(models.Stock, stock_id)
         if not stock:
             return None
-        price, market_cap = self._fetch_quote_and_cap(stock.symbol)
+        symbol = stock.symbol
+        # Release the pooled connection while the quote is fetched over HTTP
+        db.commit()
+        price, market_cap = self._fetch_quote_and_cap(symbol)
         if price is None and market_cap is None:
             return None
         return quote_crud.update_quote(db, stock, price, market_cap)
 
     def _fetch_quote_and_cap(self, symbol: str):
-        quote = self.client.get("/quote", {"symbol": symbol}) or {}
+        quote = (
+            self.cache.get_or_set(
+                f"finnhub:quote:{symbol}",
+                self.QUOTE_TTL_SECONDS,
+                lambda: self.client.get("/quote", {"symbol": symbol}),
+            )
+            or {}
+        )
         price = quote.get("c")
         # Finnhub profile2 has market cap
-        profile = self.client.get("/stock/profile2", {"symbol": symbol}) or {}
+        profile = (
+            self.cache.get_or_set(
+                f"finnhub:profile:{symbol}",
+                self.PROFILE_TTL_SECONDS,
+                lambda: self.client.get("/stock/profile2", {"symbol": symbol}),
+            )
+            or {}
+        )
         market_cap = profile.get("marketCapitalization")
         if market_cap is not None:
             market_cap = round(float(market_cap), 2)
@@ -1,14 +1,19 @@
+import logging
+
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from database import ScopedSession
 import app.crud.rating as rating_crud
 import app.schemas as schemas
 from app.utils.rating_utils import RatingService as RatingEngine
 import app.models as models
 
+logger = logging.getLogger(__name__)
+
 
 def calculate_and_store_rating(db: Session, stock_id: int):
-    stock = db.query(models.Stock).filter(models.Stock.id == stock_id).first()
+    stock = db.get(models.Stock, stock_id)
     if not stock:
         raise HTTPException(status_code=404, detail="Stock not found")
 
@@ -28,3 +33,22 @@ def calculate_and_store_rating(db: Session, stock_id: int):
         notes="Auto-generated rating (Finnhub)",
     )
     return rating_crud.create_rating(db, payload)
+
+
+def calculate_rating_in_background(stock_id: int) -> bool:
+    """
+    calculate_and_store_rating for use after the response has been sent.
+    Opens its own session (the request's is already closed) and logs failures
+    instead of raising, since there is no client left to report them to.
+    """
+    db = ScopedSession()
+    try:
+        calculate_and_store_rating(db, stock_id)
+        return True
+    except HTTPException as exc:
+        logger.warning("Rating for stock_id=%d not stored: %s", stock_id, exc.detail)
+    except Exception:
+        logger.exception("Rating calculation failed for stock_id=%d", stock_id)
+    finally:
+        ScopedSession.remove()
+    return False
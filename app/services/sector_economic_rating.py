@@ -223,14 +223,16 @@ class SectorEconomicRatingService:
         rows = []
         for sector in sectors:
             try:
-                row = self._rate_sector(db, sector, macro, snapshot.id)
-                rows.append(row)
+                rows.append(self._rate_sector(sector, macro, snapshot.id))
             except Exception:
                 logger.exception(
                     "sector_economic_rating: failed for sector_id=%d (non-fatal)",
                     sector.id,
                 )
-                db.rollback()
+
+        # One transaction for the whole batch rather than a commit per sector
+        db.add_all(rows)
+        db.commit()
 
         logger.info(
             "sector_economic_rating: rated %d/%d sectors from snapshot_id=%d",
@@ -246,7 +248,6 @@ class SectorEconomicRatingService:
 
     def _rate_sector(
         self,
-        db: Session,
         sector: models.Sector,
         macro_components: Dict[str, float],
         snapshot_id: int,
@@ -303,9 +304,6 @@ class SectorEconomicRatingService:
             data_source="fred_derived",
             rated_at=datetime.utcnow(),
         )
-        db.add(row)
-        db.commit()
-        db.refresh(row)
         return row
 
     @staticmethod
@@ -0,0 +1,126 @@
+import logging
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from config import get_settings
+
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis not installed
+    Redis = None  # type: ignore
+    RedisError = Exception  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class BaseKVCache:
+    """
+    Read-through cache for JSON-serializable values.
+    Empty results (None, {}, []) are never stored so a failed upstream call is
+    retried on the next read instead of being cached for the whole TTL.
+    """
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def get_or_set(
+        self, key: str, ttl_seconds: int, loader: Callable[[], Any], jitter: int = 5
+    ) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = loader()
+        if value:
+            self.set(key, value, self._ttl(ttl_seconds, jitter))
+        return value
+
+    @staticmethod
+    def _ttl(ttl_seconds: int, jitter: int) -> int:
+        # Spread expiries so keys filled together (e.g. at market open) don't all
+        # miss at the same moment
+        return ttl_seconds + random.randint(0, jitter) if jitter > 0 else ttl_seconds
+
+
+class InMemoryKVCache(BaseKVCache):
+    """
+    Per-process fallback when Redis is not configured.
+    Note: each worker keeps its own copy.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisKVCache(BaseKVCache):
+    """
+    Shared cache in Redis (orjson-encoded, SETEX expiry).
+    Redis errors are logged and treated as a miss so an outage only costs the
+    cache.
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "cache"):
+        self.redis = redis
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        full_key = f"{self.prefix}:{key}"
+        try:
+            raw = self.redis.get(full_key)
+        except RedisError as exc:
+            logger.warning("Cache read failed for %s: %s", full_key, exc)
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        full_key = f"{self.prefix}:{key}"
+        try:
+            self.redis.setex(full_key, ttl_seconds, orjson.dumps(value))
+        except RedisError as exc:
+            logger.warning("Cache write failed for %s: %s", full_key, exc)
+
+    def delete(self, key: str) -> None:
+        full_key = f"{self.prefix}:{key}"
+        try:
+            self.redis.delete(full_key)
+        except RedisError as exc:
+            logger.warning("Cache delete failed for %s: %s", full_key, exc)
+
+
+def build_kv_cache(redis_url: Optional[str]) -> BaseKVCache:
+    if redis_url and Redis is not None:
+        return RedisKVCache(Redis.from_url(redis_url, socket_timeout=1))
+    return InMemoryKVCache()
+
+
+@lru_cache
+def get_kv_cache() -> BaseKVCache:
+    """Process-wide cache built from settings.redis_url on first use."""
+    return build_kv_cache(get_settings().redis_url)
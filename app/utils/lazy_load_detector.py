@@ -0,0 +1,44 @@
+"""
+Development-only N+1 detector.
+
+Logs whenever the same relationship is lazy-loaded more than once within a
+single session, which almost always means a loop is triggering one SELECT per
+row and the query needs a joinedload/selectinload option instead.
+(nplusone does the same but does not support SQLAlchemy 2.0.)
+"""
+
+import logging
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+_COUNTS_KEY = "lazy_load_counts"
+
+
+def install_lazy_load_detector(
+    session_factory: sessionmaker, level: int = logging.ERROR
+) -> None:
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _on_orm_execute(orm_execute_state: ORMExecuteState):
+        if (
+            not orm_execute_state.is_relationship_load
+            or orm_execute_state.lazy_loaded_from is None
+        ):
+            return  # eager loads (selectin/subquery) are fine
+
+        path = orm_execute_state.loader_strategy_path.path
+        mapper, prop = path[-2], path[-1]
+        key = f"{mapper.class_.__name__}.{prop.key}"
+
+        counts = orm_execute_state.session.info.setdefault(_COUNTS_KEY, Counter())
+        counts[key] += 1
+        if counts[key] == 2:  # report once per relationship per session
+            logger.log(
+                level,
+                "Potential N+1 query: %s lazy-loaded repeatedly; "
+                "add joinedload/selectinload to the originating query",
+                key,
+            )
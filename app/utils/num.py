@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+
+def r2(val):
+    """Round a numeric value to 2 decimals; None and non-numeric values pass through."""
+    if val is None:
+        return None
+    return _round2(val) if isinstance(val, (int, float)) else val
+
+
+# Scores repeat heavily (0-10 at 2dp), so memoize the float conversion + round
+@lru_cache(maxsize=4096)
+def _round2(val) -> float:
+    return round(float(val), 2)
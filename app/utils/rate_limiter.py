@@ -1,7 +1,7 @@
+import secrets
 import time
-import asyncio
-from collections import defaultdict, deque
-from typing import Deque, DefaultDict, Optional
+from array import array
+from typing import Dict, Optional
 
 from fastapi import HTTPException, Request
 
@@ -16,10 +16,28 @@ class BaseRateLimiter:
         raise NotImplementedError
 
 
+# Sliding-window log: one sorted-set entry per accepted hit, scored by its time in ms.
+# Returns the request count including the current one; rejected hits are not
+# recorded, so a client hammering past the limit doesn't extend its own lockout.
+_SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+end
+return count + 1
+"""
+
+
 class RedisRateLimiter(BaseRateLimiter):
     """
     Shared rate limiter using Redis.
-    Sliding window approximation with INCR+EXPIRE per client IP.
+    True sliding window per client IP, evaluated atomically by a Lua script (one round trip).
     """
 
     def __init__(
@@ -33,42 +51,78 @@ class RedisRateLimiter(BaseRateLimiter):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
         self.prefix = prefix
+        # register_script runs EVALSHA and only falls back to loading the script on NOSCRIPT
+        self._script = redis.register_script(_SLIDING_WINDOW_LUA)
 
     async def __call__(self, request: Request):
-        client_ip = request.client.host if request.client else "anonymous"
+        # Read the raw ASGI scope; request.client builds an Address tuple per call
+        client = request.scope.get("client")
+        client_ip = client[0] if client else "anonymous"
         key = f"{self.prefix}:{client_ip}"
-        pipe = self.redis.pipeline()
-        pipe.incr(key, 1)
-        pipe.expire(key, self.window_seconds)
-        current, _ = await pipe.execute()
-        if current and int(current) > self.max_requests:
+        now_ms = int(time.time() * 1000)
+        count = await self._script(
+            keys=[key],
+            args=[
+                now_ms,
+                self.window_seconds * 1000,
+                self.max_requests,
+                f"{now_ms}-{secrets.token_hex(4)}",
+            ],
+        )
+        if int(count) > self.max_requests:
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
 
+class _BucketWindow:
+    __slots__ = ("counts", "last_second", "total")
+
+    def __init__(self, slots: int, now: int):
+        self.counts = array("I", [0]) * slots
+        self.last_second = now
+        self.total = 0
+
+
 class InMemoryRateLimiter(BaseRateLimiter):
     """
     Lightweight in-process rate limiter.
-    Uses a sliding window per client IP: max_requests within window_seconds.
+    Counts hits per client IP in a ring of one-second buckets spanning window_seconds,
+    with a running total, so each request is O(1) instead of scanning old timestamps.
+    No lock: __call__ never awaits, so it runs atomically on the event loop.
     Note: per-process only; for multi-instance deployments use Redis-backed limiter instead.
     """
 
     def __init__(self, max_requests: int = 60, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self._hits: DefaultDict[str, Deque[float]] = defaultdict(deque)
-        self._lock = asyncio.Lock()
+        self._slots = max(int(window_seconds), 1)
+        self._windows: Dict[str, _BucketWindow] = {}
 
     async def __call__(self, request: Request):
-        client_ip = request.client.host if request.client else "anonymous"
-        now = time.time()
-        async with self._lock:
-            window = self._hits[client_ip]
-            # drop expired hits
-            while window and now - window[0] > self.window_seconds:
-                window.popleft()
-            if len(window) >= self.max_requests:
-                raise HTTPException(status_code=429, detail="Rate limit exceeded")
-            window.append(now)
+        # Read the raw ASGI scope; request.client builds an Address tuple per call
+        client = request.scope.get("client")
+        client_ip = client[0] if client else "anonymous"
+        now = int(time.time())
+        window = self._windows.get(client_ip)
+        if window is None:
+            window = self._windows[client_ip] = _BucketWindow(self._slots, now)
+
+        elapsed = now - window.last_second
+        if elapsed > 0:
+            # zero the buckets that rotated out of the window since the last hit
+            counts = window.counts
+            for second in range(
+                window.last_second + 1,
+                window.last_second + min(elapsed, self._slots) + 1,
+            ):
+                idx = second % self._slots
+                window.total -= counts[idx]
+                counts[idx] = 0
+            window.last_second = now
+
+        if window.total >= self.max_requests:
+            raise HTTPException(status_code=429, detail="Rate limit exceeded")
+        window.counts[now % self._slots] += 1
+        window.total += 1
 
 
 # Factory to select limiter at import time
@@ -6,7 +6,9 @@ and stay within the 60 req/min rate limit on the free plan.
 
 from collections import deque
 from datetime import datetime, timedelta
+from functools import lru_cache
 import os
+import threading
 import time
 from typing import Dict, Optional
 
@@ -14,35 +16,71 @@ import numpy as np
 import pandas as pd
 import requests
 from pandas_datareader import data as pdr
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from config import get_settings
-from database import SessionLocal
+from database import ScopedSession
+import app.crud.economic_snapshot as economic_crud
 import app.models as models
 from services.economic_service import EconomicService
 
 
+def _build_http_session() -> requests.Session:
+    """Keep-alive session shared by all Finnhub calls (one TLS handshake per pooled connection)."""
+    session = requests.Session()
+    # urllib3 retries transient gateway errors; 429s are handled in FinnhubClient.get
+    # so that each retry goes back through the throttle
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip"})
+    return session
+
+
 class FinnhubClient:
-    """Minimal Finnhub REST client with naive per-minute throttling."""
+    """Minimal Finnhub REST client with per-minute throttling and even pacing."""
 
     BASE_URL = "https://finnhub.io/api/v1"
+    _session = _build_http_session()
 
     def __init__(self, api_key: str, max_per_minute: int = 55):
         if not api_key:
             raise ValueError("FINNHUB_API_KEY is required")
         self.api_key = api_key
         self.max_per_minute = max_per_minute
+        # Leaky bucket: space calls evenly instead of bursting the whole
+        # minute's budget up front (bursts are what trigger Finnhub 429s)
+        self._base_interval = 60.0 / max_per_minute
+        # Adaptive (AIMD): doubled on a 429, eased back toward the base on success
+        self._min_interval = self._base_interval
+        self._next_call_at = 0.0
         self._call_times = deque()
+        # Shared across worker threads (e.g. QuoteService.refresh_all_quotes)
+        self._throttle_lock = threading.Lock()
 
     def _throttle(self):
-        now = time.time()
-        while self._call_times and now - self._call_times[0] > 60:
-            self._call_times.popleft()
-        if len(self._call_times) >= self.max_per_minute:
-            sleep_for = 60 - (now - self._call_times[0]) + 0.05
-            time.sleep(max(sleep_for, 0))
-        self._call_times.append(time.time())
+        with self._throttle_lock:
+            now = time.time()
+            if now < self._next_call_at:
+                time.sleep(self._next_call_at - now)
+                now = time.time()
+            while self._call_times and now - self._call_times[0] > 60:
+                self._call_times.popleft()
+            if len(self._call_times) >= self.max_per_minute:
+                sleep_for = 60 - (now - self._call_times[0]) + 0.05
+                time.sleep(max(sleep_for, 0))
+            now = time.time()
+            self._call_times.append(now)
+            self._next_call_at = now + self._min_interval
 
     def get(self, path: str, params: Optional[dict] = None) -> Optional[dict]:
         params = params or {}
@@ -50,14 +88,76 @@ class FinnhubClient:
 
         for attempt in range(3):
             self._throttle()
-            resp = requests.get(f"{self.BASE_URL}{path}", params=params, timeout=10)
+            resp = self._session.get(self.BASE_URL + path, params=params, timeout=10)
+            self._apply_backpressure(resp, attempt)
             if resp.status_code == 429:
-                time.sleep(1.5 * (attempt + 1))
                 continue
             resp.raise_for_status()
             return resp.json()
         return None
 
+    def _apply_backpressure(self, resp: requests.Response, attempt: int) -> None:
+        """
+        Adjust pacing from Finnhub's rate-limit headers. Delays are applied by
+        moving _next_call_at, so every thread sharing the client backs off.
+        """
+        now = time.time()
+        remaining = _header_float(resp, "X-Ratelimit-Remaining")
+        reset_at = _header_float(resp, "X-Ratelimit-Reset")
+        with self._throttle_lock:
+            if resp.status_code == 429:
+                self._min_interval = min(
+                    self._min_interval * 2, self._base_interval * 8
+                )
+                retry_after = _header_float(resp, "Retry-After")
+                if retry_after is not None:
+                    resume_at = now + retry_after
+                elif reset_at is not None and reset_at > now:
+                    resume_at = reset_at
+                else:
+                    resume_at = now + 1.5 * (attempt + 1)
+                self._next_call_at = max(self._next_call_at, resume_at)
+                return
+
+            self._min_interval = max(
+                self._base_interval, self._min_interval - 0.1 * self._base_interval
+            )
+            # Nearly out of budget for this window: wait for the reset instead
+            # of spending the last calls and collecting 429s
+            if (
+                remaining is not None
+                and reset_at is not None
+                and remaining < max(1, 0.1 * self.max_per_minute)
+                and reset_at > now
+            ):
+                self._next_call_at = max(self._next_call_at, reset_at)
+
+
+def _header_float(resp: requests.Response, name: str) -> Optional[float]:
+    try:
+        return float(resp.headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def get_finnhub_client(
+    api_key: Optional[str] = None, max_per_minute: int = 55
+) -> FinnhubClient:
+    """
+    Process-wide client per API key, so every service shares one throttle and
+    connection pool instead of each spending the per-minute budget separately.
+    The key is resolved before the cache lookup, so None and the configured key
+    get the same client.
+    """
+    return _finnhub_client_for(
+        api_key or get_settings().finnhub_api_key, max_per_minute
+    )
+
+
+@lru_cache
+def _finnhub_client_for(api_key: str, max_per_minute: int) -> FinnhubClient:
+    return FinnhubClient(api_key, max_per_minute=max_per_minute)
+
 
 class RatingService:
     """Calculate stock ratings from Finnhub data and persist indicators."""
@@ -69,9 +169,7 @@ class RatingService:
     ):
         self.db = db_session
         settings = get_settings()
-        self.finnhub = FinnhubClient(
-            finnhub_api_key or os.getenv("FINNHUB_API_KEY") or settings.finnhub_api_key
-        )
+        self.finnhub = get_finnhub_client(finnhub_api_key)
         fred_key = (
             settings.fred_api_key
             if hasattr(settings, "fred_api_key")
@@ -81,19 +179,18 @@ class RatingService:
 
         self._economic_cache = None
         self._economic_cache_time = None
+        # calculate_rating may run from several worker threads (jobs/runner.py)
+        self._economic_lock = threading.Lock()
 
-        self.weights = {
-            "technical": 0.25,
-            "analyst": 0.25,
-            "fundamental": 0.25,
-            "economic": 0.25,
-        }
+        # Ordered as technical, analyst, fundamental, economic; a stacked (N, 4)
+        # score matrix can be weighted in one call with scores @ self.weights
+        self.weights = np.array([0.25, 0.25, 0.25, 0.25])
 
         self.technical_ttl_hours = 6
         self.fundamental_ttl_hours = 24
 
     def calculate_rating(self, symbol: str, db: Session = None) -> Optional[Dict]:
-        db = db or self.db or SessionLocal()
+        db = db or self.db or ScopedSession()
         try:
             stock = self._get_or_create_stock(symbol, db)
             technical = self._get_or_fetch_technical(stock, db)
@@ -101,14 +198,14 @@ class RatingService:
             fundamental = self._get_or_fetch_fundamental(stock, db)
             fundamental_score = self._calculate_fundamental_score(fundamental)
             analyst_score = self._get_analyst_score(symbol)
-            economic_data = self._get_economic_score()
+            economic_data = self._get_economic_score(db)
             economic_score = economic_data["economic_score"]
 
-            overall_rating = (
-                technical_score * self.weights["technical"]
-                + analyst_score * self.weights["analyst"]
-                + fundamental_score * self.weights["fundamental"]
-                + economic_score * self.weights["economic"]
+            overall_rating = float(
+                np.dot(
+                    [technical_score, analyst_score, fundamental_score, economic_score],
+                    self.weights,
+                )
             )
 
             return {
@@ -174,7 +271,6 @@ class RatingService:
         )
         db.add(stock)
         db.commit()
-        db.refresh(stock)
         return stock
 
     def _get_or_fetch_technical(
@@ -226,14 +322,21 @@ class RatingService:
     def _compute_and_store_technical(
         self, stock: models.Stock, hist: pd.DataFrame, db: Session
     ) -> models.TechnicalIndicator:
-        sma_50 = hist["Close"].rolling(window=50).mean().iloc[-1]
-        sma_200 = hist["Close"].rolling(window=200).mean().iloc[-1]
-        ema_12 = hist["Close"].ewm(span=12).mean().iloc[-1]
-        ema_26 = hist["Close"].ewm(span=26).mean().iloc[-1]
-        rsi = self._calculate_rsi(hist["Close"])
-        macd, macd_signal = self._calculate_macd(hist["Close"])
-        rolling_mean = hist["Close"].rolling(window=20).mean().iloc[-1]
-        rolling_std = hist["Close"].rolling(window=20).std().iloc[-1]
+        # Only the latest value of each indicator is stored, so the simple
+        # moving averages reduce just their tail window instead of rolling
+        # over the whole year of history.
+        closes = hist["Close"]
+        close = closes.to_numpy(dtype=float)
+        sma_50 = self._tail_mean(close, 50)
+        sma_200 = self._tail_mean(close, 200)
+        ema_fast = closes.ewm(span=12).mean()
+        ema_slow = closes.ewm(span=26).mean()
+        ema_12 = ema_fast.iloc[-1]
+        ema_26 = ema_slow.iloc[-1]
+        rsi = self._calculate_rsi(close)
+        macd, macd_signal = self._calculate_macd(ema_fast, ema_slow)
+        rolling_mean = self._tail_mean(close, 20)
+        rolling_std = close[-20:].std(ddof=1) if close.size >= 20 else np.nan
         bollinger_upper = rolling_mean + 2 * rolling_std
         bollinger_lower = rolling_mean - 2 * rolling_std
 
@@ -248,12 +351,11 @@ class RatingService:
             macd_signal=float(macd_signal),
             bollinger_upper=float(bollinger_upper),
             bollinger_lower=float(bollinger_lower),
-            current_price=float(hist["Close"].iloc[-1]),
+            current_price=float(close[-1]),
             data_source="finnhub",
         )
         db.add(technical)
         db.commit()
-        db.refresh(technical)
         return technical
 
     def _get_or_fetch_fundamental(
@@ -303,7 +405,6 @@ class RatingService:
         )
         db.add(fundamental)
         db.commit()
-        db.refresh(fundamental)
         return fundamental
 
     def _get_analyst_score(self, symbol: str) -> float:
@@ -331,15 +432,33 @@ class RatingService:
             print(f"Error getting analyst score: {e}")
             return 5.0
 
-    def _get_economic_score(self) -> Dict:
-        if self._economic_cache and self._economic_cache_time:
-            if datetime.now() - self._economic_cache_time < timedelta(hours=1):
-                return self._economic_cache
-
-        economic_data = self.economic_service.calculate_economic_score()
-        self._economic_cache = economic_data
-        self._economic_cache_time = datetime.now()
-        return economic_data
+    def _get_economic_score(self, db: Session) -> Dict:
+        # One FRED refresh per hour even when several threads miss together
+        with self._economic_lock:
+            if self._economic_cache and self._economic_cache_time:
+                if datetime.now() - self._economic_cache_time < timedelta(hours=1):
+                    return self._economic_cache
+
+            # Read through the stored snapshot (refreshed by the API/job runner)
+            # and only go to FRED when it is missing or older than an hour
+            snapshot = economic_crud.get_latest_snapshot_row(db)
+            if (
+                snapshot is not None
+                and snapshot.economic_score is not None
+                and snapshot.created_at is not None
+                and datetime.utcnow() - snapshot.created_at < timedelta(hours=1)
+            ):
+                economic_data = {
+                    "economic_score": snapshot.economic_score,
+                    "components": snapshot.components or {},
+                    "analysis": snapshot.analysis or "",
+                    "data_source": snapshot.data_source,
+                }
+            else:
+                economic_data = self.economic_service.calculate_economic_score()
+            self._economic_cache = economic_data
+            self._economic_cache_time = datetime.now()
+            return economic_data
 
     def _calculate_technical_score(self, technical: models.TechnicalIndicator) -> float:
         try:
@@ -402,19 +521,28 @@ class RatingService:
             print(f"Error calculating fundamental score: {e}")
             return 5.0
 
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.iloc[-1] if not np.isnan(rsi.iloc[-1]) else 50
+    @staticmethod
+    def _tail_mean(values: np.ndarray, window: int) -> float:
+        """Last value of a rolling mean; NaN until a full window exists."""
+        if values.size < window:
+            return np.nan
+        return values[-window:].mean()
+
+    def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
+        if prices.size < period:
+            return 50
+        # Sum over the window divided by period: with exactly `period` prices the
+        # first (undefined) change counts as zero, as in the rolling version.
+        delta = np.diff(prices[-(period + 1) :])
+        gain = np.where(delta > 0, delta, 0.0).sum() / period
+        loss = np.where(delta < 0, -delta, 0.0).sum() / period
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - (100 / (1 + gain / loss))
+        return rsi if not np.isnan(rsi) else 50
 
     def _calculate_macd(
-        self, prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9
+        self, ema_fast: pd.Series, ema_slow: pd.Series, signal: int = 9
     ):
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
         macd = ema_fast - ema_slow
         signal_line = macd.ewm(span=signal).mean()
         return macd.iloc[-1], signal_line.iloc[-1]
@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+import orjson
+
+from config import get_settings
+
+
+class ResponseCache:
+    """
+    Small in-process cache for rarely-changing GET endpoints.
+    Stores the serialized JSON body per namespace + request path/query for
+    ttl_seconds and answers with ETag / Cache-Control so browsers can
+    revalidate with If-None-Match and get a 304.
+    headers_for(value) may add response headers derived from the built value
+    (e.g. a pagination cursor); they are cached alongside the body.
+    Pass a prebuilt TypeAdapter for the value's type to serialize it in one
+    pydantic-core pass instead of jsonable_encoder + orjson.
+    Each namespace keeps entries in write (= expiry) order: expired ones are
+    dropped on every write and the oldest go first past max_entries, so
+    scanning many distinct queries can't grow memory without bound.
+    Note: per-process only; each worker keeps its own copy.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[
+            str, "OrderedDict[str, Tuple[bytes, str, float, Dict[str, str]]]"
+        ] = {}
+        self._lock = threading.Lock()
+
+    def respond(
+        self,
+        request: Request,
+        namespace: str,
+        build: Callable[[], Any],
+        exclude: Optional[Any] = None,
+        headers_for: Optional[Callable[[Any], Dict[str, str]]] = None,
+        adapter: Optional[TypeAdapter] = None,
+    ) -> Response:
+        key = self._key(request)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(namespace, {}).get(key)
+        if entry is None or entry[2] <= now:
+            value = build()
+            if adapter is not None:
+                body = adapter.dump_json(value, exclude=exclude)
+            else:
+                body = orjson.dumps(
+                    jsonable_encoder(value, exclude=exclude),
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                )
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            extra = headers_for(value) if headers_for else {}
+            entry = (body, etag, now + self.ttl_seconds, extra)
+            with self._lock:
+                self._store(namespace, key, entry, now)
+
+        body, etag, _, extra = entry
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"max-age={self.ttl_seconds}",
+            **extra,
+        }
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def _store(
+        self,
+        namespace: str,
+        key: str,
+        entry: Tuple[bytes, str, float, Dict[str, str]],
+        now: float,
+    ) -> None:
+        entries = self._entries.setdefault(namespace, OrderedDict())
+        # Re-insert at the end so order stays by expiry time
+        entries.pop(key, None)
+        entries[key] = entry
+        while entries:
+            oldest = next(iter(entries.values()))
+            if oldest[2] > now and len(entries) <= self.max_entries:
+                break
+            entries.popitem(last=False)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(namespace, None)
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        query = "&".join(
+            f"{k}={v}" for k, v in sorted(request.query_params.multi_items())
+        )
+        return f"{request.url.path}?{query}"
+
+
+# Shared instance so write endpoints can invalidate what read endpoints cached
+response_cache = ResponseCache(
+    ttl_seconds=get_settings().response_cache_ttl_seconds,
+    max_entries=get_settings().response_cache_max_entries,
+)
@@ -4,16 +4,72 @@ One-time schema bootstrap for all SQLAlchemy models.
 Usage (requires DATABASE_URL env var to point at your DB):
     python bootstrap_schema.py
 
-Safe to re-run; it only creates missing tables.
+Safe to re-run; it only creates missing tables and indexes and applies
+idempotent upgrades, all in one transaction.
 """
 
-from database import Base, engine  # uses DATABASE_URL from config/settings
+from database import ensure_schema  # uses DATABASE_URL from config/settings
 import app.models  # noqa: F401 ensures models are imported and registered
 
+# Idempotent in-place upgrades for tables that predate a model change
+# (create_all never alters existing tables). Each statement must be safe to re-run.
+UPGRADE_STATEMENTS = [
+    # Denormalized latest/previous rating pointers on stocks
+    "ALTER TABLE stocks ADD COLUMN IF NOT EXISTS latest_rating_id INTEGER "
+    "CONSTRAINT fk_stocks_latest_rating_id REFERENCES ratings(id) ON DELETE SET NULL",
+    "ALTER TABLE stocks ADD COLUMN IF NOT EXISTS prev_rating_id INTEGER "
+    "CONSTRAINT fk_stocks_prev_rating_id REFERENCES ratings(id) ON DELETE SET NULL",
+    "ALTER TABLE stocks ADD COLUMN IF NOT EXISTS rating_trend VARCHAR(10)",
+    """
+    WITH ranked AS (
+        SELECT
+            id,
+            stock_id,
+            overall_rating,
+            row_number() OVER w AS rn,
+            lead(id) OVER w AS prev_id,
+            lead(overall_rating) OVER w AS prev_rating
+        FROM ratings
+        WINDOW w AS (PARTITION BY stock_id ORDER BY rating_date DESC)
+    )
+    UPDATE stocks s
+    SET latest_rating_id = r.id,
+        prev_rating_id = r.prev_id,
+        rating_trend = CASE
+            WHEN r.prev_id IS NULL THEN 'new'
+            WHEN r.overall_rating > r.prev_rating THEN 'up'
+            WHEN r.overall_rating < r.prev_rating THEN 'down'
+            ELSE 'stable'
+        END
+    FROM ranked r
+    WHERE r.stock_id = s.id AND r.rn = 1 AND s.latest_rating_id IS NULL
+    """,
+    # News search moved from an (unpopulated) tsvector to pg_trgm indexes
+    "DROP INDEX IF EXISTS idx_search",
+    "ALTER TABLE news_articles DROP COLUMN IF EXISTS search_vector",
+    # Superseded by the covering idx_rating_stock_date_cover
+    "DROP INDEX IF EXISTS idx_rating_stock_date",
+    # News date lookups use idx_stock_date or the BRIN idx_news_published_ts_brin
+    "DROP INDEX IF EXISTS ix_news_articles_published_at",
+    "DROP INDEX IF EXISTS idx_source_date",
+    # Re-analyze after bulk news loads so BRIN ranges are costed on fresh stats
+    "ALTER TABLE news_articles SET (autovacuum_analyze_scale_factor = 0.02)",
+    # Epoch-seconds publish time; range filters and the BRIN index use this
+    "ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS published_ts BIGINT",
+    "UPDATE news_articles SET published_ts = extract(epoch FROM published_at)::bigint "
+    "WHERE published_ts IS NULL AND published_at IS NOT NULL",
+    "DROP INDEX IF EXISTS idx_news_published_brin",
+    # Duplicates of the primary keys or of composite-index prefixes
+    "DROP INDEX IF EXISTS ix_stocks_id",
+    "DROP INDEX IF EXISTS ix_news_articles_id",
+    "DROP INDEX IF EXISTS ix_news_articles_stock_id",
+    "DROP INDEX IF EXISTS ix_news_articles_source",
+]
+
 
 def main():
-    print("Creating tables if missing...")
-    Base.metadata.create_all(bind=engine)
+    print("Creating/upgrading schema...")
+    ensure_schema(UPGRADE_STATEMENTS)
     print("Done.")
 
 
@@ -2,7 +2,7 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 from typing import List, Union
 from pydantic import field_validator
-import json
+import orjson
 
 
 class Settings(BaseSettings):
@@ -13,6 +13,11 @@ class Settings(BaseSettings):
     database_url: str
     redis_url: str | None = None
     log_level: str = "INFO"
+    # "dev" enables development-only diagnostics such as the N+1 query detector
+    env: str = "production"
+    # Raise on any relationship a stock query didn't eager-load (tests/dev): turns
+    # a would-be N+1 lazy load into an immediate error
+    strict_relationships: bool = False
     # Accepts list or string from env; validator normalizes to list[str]
     allowed_origins: Union[list[str], str] = [
         "http://localhost:3000",
@@ -20,8 +25,21 @@ class Settings(BaseSettings):
     ]
     # Default to 1 worker for low-memory deploy tiers; override via env WORKERS
     workers: int = 1
+    # SQLAlchemy connection pool; db_pool_size is the total across all workers
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
     rate_limit_max_requests: int = 60
     rate_limit_window_seconds: int = 60
+    # How long a normalized economic snapshot is served before re-checking the DB
+    economic_cache_ttl_seconds: int = 60
+    # Lifetime of the same snapshot entry in the shared KV cache (Redis)
+    economic_shared_cache_ttl_seconds: int = 300
+    # Max-age for cached sector/stock listings (also sent as Cache-Control)
+    response_cache_ttl_seconds: int = 30
+    # Per-namespace cap on cached listing variants (search/skip/cursor queries)
+    response_cache_max_entries: int = 1000
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="allow"
@@ -48,7 +66,7 @@ class Settings(BaseSettings):
                     raw = raw[1:-1]
                 if raw.startswith("["):
                     # Try JSON array, e.g. ["https://a","https://b"]
-                    loaded = json.loads(raw)
+                    loaded = orjson.loads(raw)
                     if isinstance(loaded, list):
                         parsed = [
                             str(item).strip().strip('"').strip("'")
@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
+import orjson
 import os
 from config import get_settings
 
@@ -8,17 +9,67 @@ settings = get_settings()
 
 DATABASE_URL = settings.database_url
 
+# Each gunicorn worker gets its own pool; split the budget so the total number of
+# connections stays roughly constant as WORKERS grows.
+POOL_SIZE = max(5, settings.db_pool_size // max(settings.workers, 1))
+
+
+def _json_serializer(value) -> str:
+    # JSON columns (snapshots, raw metrics) may hold numpy scalars or int keys
+    return orjson.dumps(
+        value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
 engine = create_engine(
     DATABASE_URL,
-    pool_size=10,
-    max_overflow=5,
+    pool_size=POOL_SIZE,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
     pool_pre_ping=True,
-    pool_recycle=1800,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    # Reuse the most recently returned connection so bursts are served by warm
+    # connections and the surplus sits idle long enough to be recycled
+    pool_use_lifo=True,
+    # Batch executemany UPDATE/DELETE (e.g. bulk quote updates) with execute_batch
+    executemany_mode="values_plus_batch",
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Keep loaded attributes after commit: every column default is client-side, so a
+# freshly committed object is already complete and serializing it shouldn't
+# trigger a reload SELECT (which is why the CRUD helpers don't refresh).
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+# Thread-local sessions for code running outside a request (jobs, background
+# work); call ScopedSession.remove() when the unit of work is done.
+ScopedSession = scoped_session(SessionLocal)
 Base = declarative_base()
 
 
+def ensure_schema(upgrade_statements=()):
+    """
+    Create or upgrade the schema in a single transaction.
+    A fresh database (no stocks table) gets every table and index in one
+    create_all pass without per-table existence probes; an existing one gets
+    missing tables, the idempotent upgrade_statements, then missing indexes.
+    Models must be imported first so they are registered on Base.
+    """
+    with engine.begin() as conn:
+        fresh = (
+            conn.execute(text("SELECT to_regclass('public.stocks')")).scalar() is None
+        )
+        Base.metadata.create_all(bind=conn, checkfirst=not fresh)
+        for statement in upgrade_statements:
+            conn.execute(text(statement))
+        if not fresh:
+            # create_all skips indexes on tables that already exist
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=conn, checkfirst=True)
+
+
 # get database session
 def get_db():
     db = SessionLocal()
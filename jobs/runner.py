@@ -23,13 +23,14 @@ for observability; the table is created if missing.
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import datetime as dt
 import logging
 import sys
 from pathlib import Path
 from typing import Optional
 
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 # Ensure project root is on PYTHONPATH when invoked directly (e.g., from cron).
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -39,12 +40,14 @@ if str(ROOT_DIR) not in sys.path:
 import app.models as models
 from app.utils.rating_utils import RatingService
 from config import get_settings
-from database import SessionLocal, engine
+from database import ScopedSession, engine
 import app.crud.economic_snapshot as economic_crud
+import app.crud.rating as rating_crud
 from services.economic_service import EconomicService
 from app.services.sector_economic_rating import SectorEconomicRatingService
 from app.services.quote import QuoteService
 from app.services.news import NewsService
+from app.utils.kv_cache import get_kv_cache
 
 settings = get_settings()
 logging.basicConfig(
@@ -54,6 +57,22 @@ logging.basicConfig(
 logger = logging.getLogger("job_runner")
 
 
+@event.listens_for(engine, "connect")
+def _relax_commit_durability(dbapi_connection, connection_record):
+    # Jobs only write data that the next run recomputes, so don't wait for the
+    # WAL flush on each commit. Registered here, so it only affects this process.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SET synchronous_commit TO off")
+    cursor.close()
+    # psycopg2 opened a transaction for the SET; commit so a rollback can't undo it
+    dbapi_connection.commit()
+
+
+# Ratings are dominated by Stooq/Finnhub I/O; the shared Finnhub client's
+# throttle still caps the overall request rate
+RECALC_WORKERS = 4
+
+
 def ensure_job_runs_table():
     """Create job_runs table if it doesn't exist (safe to run each time)."""
     ddl = """
@@ -112,30 +131,31 @@ def log_job_end(job_id: int, status: str, processed: int, error: Optional[str] =
 
 
 def task_refresh_economic() -> int:
-    db = SessionLocal()
+    db = ScopedSession()
     try:
         svc = EconomicService()
-        data = svc.calculate_economic_score()
+        data = svc.calculate_economic_score(force=True)
         snapshot = economic_crud.save_snapshot(db, data)
+        get_kv_cache().delete(economic_crud.LATEST_SNAPSHOT_CACHE_KEY)
         SectorEconomicRatingService().rate_all_sectors(db, snapshot)
         return 1
     finally:
-        db.close()
+        ScopedSession.remove()
 
 
 def task_refresh_quotes() -> int:
-    db = SessionLocal()
+    db = ScopedSession()
     try:
         svc = QuoteService()
         result = svc.refresh_all_quotes(db)
         logger.info("Quotes refreshed: %s stocks updated", result.get("updated", 0))
         return result.get("updated", 0)
     finally:
-        db.close()
+        ScopedSession.remove()
 
 
 def task_refresh_news(lookback_hours: int = 12) -> int:
-    db = SessionLocal()
+    db = ScopedSession()
     try:
         svc = NewsService()
         result = svc.fetch_and_store_all_company_news(db, lookback_hours=lookback_hours)
@@ -146,14 +166,13 @@ def task_refresh_news(lookback_hours: int = 12) -> int:
         )
         return result.get("inserted", 0)
     finally:
-        db.close()
+        ScopedSession.remove()
 
 
 def task_recalc_ratings(
     limit: Optional[int] = None, symbol: Optional[str] = None
 ) -> int:
-    db = SessionLocal()
-    processed = 0
+    db = ScopedSession()
     try:
         query = db.query(models.Stock)
         if symbol:
@@ -166,15 +185,30 @@ def task_recalc_ratings(
             logger.warning("No stocks found to process.")
             return 0
 
-        rater = RatingService(db_session=db)
-        for stock in stocks:
-            rating_data = rater.calculate_rating(stock.symbol, db=db)
+        targets = [(stock.id, stock.symbol) for stock in stocks]
+        # Release the connection while ratings are fetched; each worker thread
+        # uses its own thread-local ScopedSession inside calculate_rating
+        db.commit()
+        # The fan-out can take minutes and commit doesn't expire (see
+        # SessionLocal), so drop the loaded stocks rather than let the write
+        # loop below reuse their rating pointers
+        db.expunge_all()
+        rater = RatingService()
+        with ThreadPoolExecutor(max_workers=RECALC_WORKERS) as pool:
+            results = list(
+                pool.map(rater.calculate_rating, [symbol for _, symbol in targets])
+            )
+
+        # Collected and written together at the end: one multi-row INSERT and
+        # one commit instead of a flush + commit per stock
+        ratings = []
+        for (stock_id, symbol), rating_data in zip(targets, results):
             if not rating_data:
-                logger.warning("%s: rating failed", stock.symbol)
+                logger.warning("%s: rating failed", symbol)
                 continue
 
             rating = models.Rating(
-                stock_id=stock.id,
+                stock_id=stock_id,
                 overall_rating=rating_data["overall_rating"],
                 technical_score=rating_data.get("technical_score"),
                 analyst_score=rating_data.get("analyst_score"),
@@ -184,13 +218,20 @@ def task_recalc_ratings(
                 rating_date=dt.datetime.utcnow(),
                 data_sources=rating_data.get("data_sources"),
             )
-            db.add(rating)
+            ratings.append(rating)
+            logger.info("%s: %.1f/10", symbol, rating.overall_rating)
+
+        if ratings:
+            db.add_all(ratings)
+            db.flush()
+            # Stock rows are locked in set_latest_rating; take them in id order
+            # so concurrent runs can't deadlock
+            for rating in sorted(ratings, key=lambda r: r.stock_id):
+                rating_crud.set_latest_rating(db, rating)
             db.commit()
-            processed += 1
-            logger.info("%s: %.1f/10", stock.symbol, rating.overall_rating)
-        return processed
+        return len(ratings)
     finally:
-        db.close()
+        ScopedSession.remove()
 
 
 def main():
@@ -1,7 +1,8 @@
 import logging
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from fastapi.responses import ORJSONResponse
+from database import SessionLocal
 import uvicorn
 import os
 
@@ -16,11 +17,15 @@ from app.api import (
     analyst,
     fundamentals,
 )
+from app.utils.lazy_load_detector import install_lazy_load_detector
 from app.utils.rate_limiter import build_rate_limiter
 from config import get_settings
 
 settings = get_settings()
 
+if settings.env == "dev":
+    install_lazy_load_detector(SessionLocal)
+
 redis_client = None
 if settings.redis_url:
     try:
@@ -36,14 +41,14 @@ rate_limiter = build_rate_limiter(
     window_seconds=settings.rate_limit_window_seconds,
 )
 
-# NOTE: In production, manage schema with Alembic migrations instead of create_all
-# Base.metadata.create_all(bind=engine)
+# Schema is managed out of band with `python bootstrap_schema.py`, not per worker start
 
 app = FastAPI(
     title="Stock Rating API",
     description="API for stock ratings combining multiple data sources",
     version="1.0.0",
     dependencies=[Depends(rate_limiter)],
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware for frontend local
@@ -53,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # routers
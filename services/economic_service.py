@@ -1,7 +1,39 @@
+from bisect import bisect_right
+import math
+import numpy as np
+import pandas as pd
 import requests
-from typing import Dict, Optional, Tuple
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from datetime import date, datetime, timedelta
+import copy
 import os
+import threading
+import time
+
+from app.utils.kv_cache import get_kv_cache
+
+
+def _upto(bound: float) -> float:
+    """Breakpoint for an inclusive upper bound (x <= bound) under bisect_right."""
+    return math.nextafter(bound, math.inf)
+
+
+class _ScoreTable:
+    """
+    Piecewise score: breakpoints split the line into len(breaks) + 1 bands and
+    each band maps to a constant score or a function of the value.
+    """
+
+    __slots__ = ("breaks", "scores")
+
+    def __init__(self, breaks, scores):
+        self.breaks = breaks
+        self.scores = scores
+
+    def __call__(self, value: float) -> float:
+        score = self.scores[bisect_right(self.breaks, value)]
+        return score(value) if callable(score) else score
 
 
 class EconomicService:
@@ -10,11 +42,55 @@ class EconomicService:
     Calculates an economic score (0-10) based on current economic conditions
     """
 
+    # Weighted average (interest rates and inflation matter most for valuations)
+    COMPONENT_WEIGHTS = {
+        "interest_rates": 0.25,
+        "inflation": 0.25,
+        "growth": 0.20,
+        "employment": 0.10,
+        "yield_curve": 0.10,
+        "sentiment": 0.10,
+    }
+
+    # FRED series update daily at most; reuse fetched observations for an hour.
+    # Daily series' cache keys also carry the calendar day the request window was
+    # built from, so nothing fetched yesterday is served after midnight.
+    OBSERVATION_CACHE_TTL_SECONDS = 3600
+    # Slower series are kept longer: until their next scheduled release when the
+    # release calendar has been looked up, otherwise for their cadence's TTL
+    SERIES_CADENCE = {
+        "fed_funds_rate": "daily",
+        "treasury_10y": "daily",
+        "treasury_2y": "daily",
+        "inflation_cpi": "monthly",
+        "unemployment": "monthly",
+        "consumer_sentiment": "monthly",
+        "gdp_growth": "quarterly",
+    }
+    CADENCE_TTL_SECONDS = {
+        "daily": OBSERVATION_CACHE_TTL_SECONDS,
+        "monthly": 24 * 3600,
+        "quarterly": 7 * 24 * 3600,
+    }
+    MAX_OBSERVATION_TTL_SECONDS = 31 * 24 * 3600
+    # Whole-score results are built from those observations; keep them as long
+    RESULT_CACHE_TTL_SECONDS = OBSERVATION_CACHE_TTL_SECONDS
+    # Release ids and calendars change rarely; they are also kept in the shared
+    # KV cache (Redis when configured) so restarts and other workers reuse them
+    RELEASE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    # Cap on simultaneous FRED requests across threads (FRED rate-limits bursts)
+    FRED_MAX_CONCURRENT_REQUESTS = 5
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv("FRED_API_KEY")
         self.base_url = "https://api.stlouisfed.org/fred/series/observations"
         self.series_release_url = "https://api.stlouisfed.org/fred/series/release"
         self.release_dates_url = "https://api.stlouisfed.org/fred/release/dates"
+        # One keep-alive session (pool of 10 >= the concurrent indicator fetches)
+        # for every FRED call instead of a new TCP/TLS handshake per request
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = "snp5000/1.0"
+        self._fred_slots = threading.BoundedSemaphore(self.FRED_MAX_CONCURRENT_REQUESTS)
 
         if not self.api_key:
             print(
@@ -43,10 +119,21 @@ class EconomicService:
             "consumer_sentiment": (75, 95),  # Confident consumers
         }
 
+        self._score_tables = self._build_score_tables()
+
         # Cache release lookups to avoid extra API calls
         self._release_cache: Dict[str, Dict] = {}
-
-    def calculate_economic_score(self) -> Dict:
+        self._shared_cache = get_kv_cache()
+        # release_id -> next release date, plus a lock per release id
+        self._next_release_by_id: Dict[int, Optional[str]] = {}
+        self._release_locks: Dict[int, threading.Lock] = {}
+        # (indicator, params, day) -> (expires_at, observation); shared across threads
+        self._observation_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+        self._observation_lock = threading.Lock()
+        # (expires_at, day, result) of the last FRED-backed score
+        self._result_cache: Optional[Tuple[float, date, Dict]] = None
+
+    def calculate_economic_score(self, force: bool = False) -> Dict:
         """
         Calculate overall economic conditions score (0-10)
 
@@ -55,13 +142,34 @@ class EconomicService:
         - components: Individual indicator scores
         - indicators: Raw indicator values
         - analysis: Text explanation
+
+        FRED-backed results are reused for RESULT_CACHE_TTL_SECONDS (same day
+        only); callers get a deep copy they are free to mutate. force=True (an
+        explicit refresh) skips the cached result and cached observations,
+        refetches from FRED and caches the new result.
         """
+        now = time.monotonic()
+        today = datetime.now().date()
+        cached = self._result_cache
+        if not force and cached is not None and cached[0] > now and cached[1] == today:
+            return copy.deepcopy(cached[2])
+
+        result = self._compute_economic_score(force)
+        if result.get("data_source") == "FRED":
+            self._result_cache = (
+                now + self.RESULT_CACHE_TTL_SECONDS,
+                today,
+                copy.deepcopy(result),
+            )
+        return result
+
+    def _compute_economic_score(self, force: bool = False) -> Dict:
         try:
             if not self.api_key:
                 return self._get_default_score()
 
             # Fetch all indicators
-            indicators, indicator_meta = self._fetch_all_indicators()
+            indicators, indicator_meta = self._fetch_all_indicators(force)
 
             if not indicators:
                 return self._get_default_score()
@@ -85,61 +193,32 @@ class EconomicService:
                 indicators.get("consumer_sentiment")
             )
 
-            # Weighted average (interest rates and inflation matter most for valuations)
-            weights = {
-                "interest_rates": 0.25,
-                "inflation": 0.25,
-                "growth": 0.20,
-                "employment": 0.10,
-                "yield_curve": 0.10,
-                "sentiment": 0.10,
+            component_scores = {
+                "interest_rates": interest_rate_score,
+                "inflation": inflation_score,
+                "growth": growth_score,
+                "employment": employment_score,
+                "yield_curve": yield_curve_score,
+                "sentiment": sentiment_score,
             }
-
-            economic_score = (
-                interest_rate_score * weights["interest_rates"]
-                + inflation_score * weights["inflation"]
-                + growth_score * weights["growth"]
-                + employment_score * weights["employment"]
-                + yield_curve_score * weights["yield_curve"]
-                + sentiment_score * weights["sentiment"]
+            economic_score = sum(
+                component_scores[name] * weight
+                for name, weight in self.COMPONENT_WEIGHTS.items()
             )
 
             # Generate analysis text
             analysis = self._generate_analysis(
-                economic_score,
-                indicators,
-                {
-                    "interest_rates": interest_rate_score,
-                    "inflation": inflation_score,
-                    "growth": growth_score,
-                    "employment": employment_score,
-                    "yield_curve": yield_curve_score,
-                    "sentiment": sentiment_score,
-                },
+                economic_score, indicators, component_scores
             )
 
             indicator_context = self._generate_indicator_context(
-                indicators,
-                {
-                    "interest_rates": interest_rate_score,
-                    "inflation": inflation_score,
-                    "growth": growth_score,
-                    "employment": employment_score,
-                    "yield_curve": yield_curve_score,
-                    "sentiment": sentiment_score,
-                },
-                indicator_meta,
+                indicators, component_scores, indicator_meta
             )
 
             return {
                 "economic_score": round(economic_score, 2),
                 "components": {
-                    "interest_rates": round(interest_rate_score, 2),
-                    "inflation": round(inflation_score, 2),
-                    "growth": round(growth_score, 2),
-                    "employment": round(employment_score, 2),
-                    "yield_curve": round(yield_curve_score, 2),
-                    "sentiment": round(sentiment_score, 2),
+                    name: round(score, 2) for name, score in component_scores.items()
                 },
                 "indicators": indicators,
                 "indicator_context": indicator_context,
@@ -152,56 +231,45 @@ class EconomicService:
             print(f"Error calculating economic score: {e}")
             return self._get_default_score()
 
-    def _fetch_all_indicators(self) -> Tuple[Dict, Dict]:
+    def _fetch_all_indicators(self, force: bool = False) -> Tuple[Dict, Dict]:
         """Fetch all economic indicators from FRED with publication metadata"""
         indicators: Dict[str, float] = {}
         meta: Dict[str, Dict] = {}
 
-        try:
-            # Federal Funds Rate
-            fed_funds = self._fetch_latest_observation("fed_funds_rate")
-            if fed_funds and fed_funds.get("value") is not None:
-                indicators["fed_funds_rate"] = fed_funds["value"]
-                meta["fed_funds_rate"] = self._build_meta("fed_funds_rate", fed_funds)
-
+        # indicator -> (series key for release metadata, fetch)
+        fetches = {
+            "fed_funds_rate": ("fed_funds_rate", self._fetch_latest_observation),
             # Inflation (YoY change in CPI)
-            inflation_rate = self._calculate_inflation_rate()
-            if inflation_rate and inflation_rate.get("value") is not None:
-                indicators["inflation_rate"] = inflation_rate["value"]
-                meta["inflation_rate"] = self._build_meta(
-                    "inflation_cpi", inflation_rate
-                )
+            "inflation_rate": (
+                "inflation_cpi",
+                lambda _, force: self._calculate_inflation_rate(force=force),
+            ),
+            "gdp_growth": ("gdp_growth", self._fetch_latest_observation),
+            "unemployment": ("unemployment", self._fetch_latest_observation),
+            "treasury_10y": ("treasury_10y", self._fetch_latest_observation),
+            "treasury_2y": ("treasury_2y", self._fetch_latest_observation),
+            "consumer_sentiment": (
+                "consumer_sentiment",
+                self._fetch_latest_observation,
+            ),
+        }
 
-            # GDP Growth (latest quarterly rate)
-            gdp_growth = self._fetch_latest_observation("gdp_growth")
-            if gdp_growth and gdp_growth.get("value") is not None:
-                indicators["gdp_growth"] = gdp_growth["value"]
-                meta["gdp_growth"] = self._build_meta("gdp_growth", gdp_growth)
-
-            # Unemployment Rate
-            unemployment = self._fetch_latest_observation("unemployment")
-            if unemployment and unemployment.get("value") is not None:
-                indicators["unemployment"] = unemployment["value"]
-                meta["unemployment"] = self._build_meta("unemployment", unemployment)
-
-            # Treasury Yields
-            treasury_10y = self._fetch_latest_observation("treasury_10y")
-            if treasury_10y and treasury_10y.get("value") is not None:
-                indicators["treasury_10y"] = treasury_10y["value"]
-                meta["treasury_10y"] = self._build_meta("treasury_10y", treasury_10y)
-
-            treasury_2y = self._fetch_latest_observation("treasury_2y")
-            if treasury_2y and treasury_2y.get("value") is not None:
-                indicators["treasury_2y"] = treasury_2y["value"]
-                meta["treasury_2y"] = self._build_meta("treasury_2y", treasury_2y)
-
-            # Consumer Sentiment
-            sentiment = self._fetch_latest_observation("consumer_sentiment")
-            if sentiment and sentiment.get("value") is not None:
-                indicators["consumer_sentiment"] = sentiment["value"]
-                meta["consumer_sentiment"] = self._build_meta(
-                    "consumer_sentiment", sentiment
-                )
+        def fetch_one(name: str):
+            series_key, fetch = fetches[name]
+            observation = fetch(series_key, force=force)
+            if not observation or observation.get("value") is None:
+                return None
+            return observation["value"], self._build_meta(series_key, observation)
+
+        try:
+            # Each series (plus its release lookup) is an independent blocking
+            # request; run them side by side so latency is the slowest, not the sum
+            with ThreadPoolExecutor(max_workers=len(fetches)) as pool:
+                results = list(pool.map(fetch_one, fetches))
+
+            for name, result in zip(fetches, results):
+                if result is not None:
+                    indicators[name], meta[name] = result
 
             return indicators, meta
 
@@ -209,11 +277,91 @@ class EconomicService:
             print(f"Error fetching indicators: {e}")
             return {}, {}
 
-    def _fetch_latest_observation(
-        self, indicator_key: str, days_back: int = 400, observations: int = 2
+    def _cached_observation(
+        self,
+        key: Tuple,
+        fetch: Callable[[], Optional[Dict]],
+        ttl_seconds: Optional[float] = None,
+        force: bool = False,
     ) -> Optional[Dict]:
-        """Fetch the most recent observation (and optional previous) for an indicator"""
+        """
+        Serve key from the observation cache, fetching on a miss; misses aren't
+        cached. force always fetches (and replaces the cached entry).
+        """
+        now = time.monotonic()
+        with self._observation_lock:
+            entry = None if force else self._observation_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return dict(entry[1])
+        result = fetch()
+        if result is not None:
+            with self._observation_lock:
+                # Drop expired entries so the dict stays small
+                for stale in [
+                    k for k, v in self._observation_cache.items() if v[0] <= now
+                ]:
+                    del self._observation_cache[stale]
+                self._observation_cache[key] = (
+                    now + (ttl_seconds or self.OBSERVATION_CACHE_TTL_SECONDS),
+                    dict(result),
+                )
+        return result
 
+    def _fred_get(self, url: str, params: Dict) -> Dict:
+        """GET a FRED endpoint on the shared session, at most N requests at a time."""
+        with self._fred_slots:
+            response = self._session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def _fetch_latest_observation(
+        self,
+        indicator_key: str,
+        days_back: int = 400,
+        observations: int = 2,
+        units: Optional[str] = None,
+        force: bool = False,
+    ) -> Optional[Dict]:
+        """
+        Fetch the most recent observation (and optional previous) for an indicator.
+        units is a FRED data transformation (e.g. "pc1" = % change from a year ago)
+        applied server-side.
+        """
+        cadence = self.SERIES_CADENCE.get(indicator_key, "daily")
+        key = ("observation", indicator_key, days_back, observations, units)
+        if cadence == "daily":
+            key = (*key, datetime.now().date())
+        return self._cached_observation(
+            key,
+            lambda: self._request_latest_observation(
+                indicator_key, days_back, observations, units
+            ),
+            ttl_seconds=self._observation_ttl(indicator_key, cadence),
+            force=force,
+        )
+
+    def _observation_ttl(self, indicator_key: str, cadence: str) -> float:
+        """Cache lifetime for a series: its cadence TTL, or until its next release."""
+        ttl = self.CADENCE_TTL_SECONDS[cadence]
+        next_release = self._release_cache.get(indicator_key, {}).get("next_release")
+        if cadence == "daily" or not next_release:
+            return ttl
+        until_release = (
+            datetime.strptime(next_release, "%Y-%m-%d") - datetime.now()
+        ).total_seconds()
+        if until_release <= 0:
+            # On (or after) release day, fall back to hourly re-checks
+            return self.OBSERVATION_CACHE_TTL_SECONDS
+        # Capped so a bad calendar entry can't pin old data indefinitely
+        return min(until_release, self.MAX_OBSERVATION_TTL_SECONDS)
+
+    def _request_latest_observation(
+        self,
+        indicator_key: str,
+        days_back: int,
+        observations: int,
+        units: Optional[str] = None,
+    ) -> Optional[Dict]:
         try:
             series_id = self.series_ids.get(indicator_key)
             if not series_id:
@@ -233,10 +381,10 @@ class EconomicService:
                 "sort_order": "desc",
                 "limit": observations,
             }
+            if units:
+                params["units"] = units
 
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._fred_get(self.base_url, params)
 
             observations_list = data.get("observations", [])
             if not observations_list:
@@ -264,68 +412,9 @@ class EconomicService:
             print(f"Error fetching {indicator_key}: {e}")
             return None
 
-    def _calculate_inflation_rate(self) -> Optional[Dict]:
-        """Calculate year-over-year inflation rate from CPI data with metadata"""
-        try:
-            series_id = self.series_ids["inflation_cpi"]
-
-            # Get CPI from last 13 months (enough for YoY)
-            end_date = datetime.now().strftime("%Y-%m-%d")
-            start_date = (datetime.now() - timedelta(days=400)).strftime("%Y-%m-%d")
-
-            params = {
-                "series_id": series_id,
-                "api_key": self.api_key,
-                "file_type": "json",
-                "observation_start": start_date,
-                "observation_end": end_date,
-                "sort_order": "desc",
-                "limit": 14,
-            }
-
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            observations = data.get("observations", [])
-            if len(observations) < 2:
-                return None
-
-            current = observations[0]
-            year_ago = observations[-1]
-
-            current_cpi = float(current.get("value"))
-            year_ago_cpi = float(year_ago.get("value"))
-
-            inflation_rate = ((current_cpi - year_ago_cpi) / year_ago_cpi) * 100
-
-            result = {
-                "value": inflation_rate,
-                "date": current.get("date"),
-            }
-
-            # Best-effort previous YoY figure for change context
-            if len(observations) >= 14:
-                prev_current = observations[1]
-                prev_year_ago = observations[-2]
-                try:
-                    prev_inflation = (
-                        (
-                            float(prev_current.get("value"))
-                            - float(prev_year_ago.get("value"))
-                        )
-                        / float(prev_year_ago.get("value"))
-                    ) * 100
-                    result["previous_value"] = prev_inflation
-                    result["previous_date"] = prev_current.get("date")
-                except Exception:
-                    pass
-
-            return result
-
-        except Exception as e:
-            print(f"Error calculating inflation: {e}")
-            return None
+    def _calculate_inflation_rate(self, force: bool = False) -> Optional[Dict]:
+        """Year-over-year CPI inflation, computed by FRED (units=pc1)"""
+        return self._fetch_latest_observation("inflation_cpi", units="pc1", force=force)
 
     def _build_meta(self, indicator_key: str, observation: Dict) -> Dict:
         """Add publication and next-release metadata for an indicator"""
@@ -350,17 +439,23 @@ class EconomicService:
         """Look up the next scheduled release date for a series (best effort)"""
 
         try:
-            # Cache hit
-            cached = self._release_cache.get(indicator_key)
-            if cached and cached.get("next_release"):
-                return cached.get("next_release")
-
             series_id = self.series_ids.get(indicator_key)
             if not series_id:
                 return None
 
+            shared_key = f"fred:release:{series_id}"
+            cached = self._release_cache.get(indicator_key)
+            if cached is None:
+                cached = self._shared_cache.get(shared_key) or {}
+                self._release_cache[indicator_key] = cached
+
+            # Cache hit, unless that release date has already passed
+            next_release = cached.get("next_release")
+            if next_release and next_release >= datetime.now().strftime("%Y-%m-%d"):
+                return next_release
+
             # First find the release_id associated with the series
-            release_id = self._release_cache.get(indicator_key, {}).get("release_id")
+            release_id = cached.get("release_id")
 
             if not release_id:
                 params = {
@@ -369,9 +464,7 @@ class EconomicService:
                     "file_type": "json",
                 }
 
-                resp = requests.get(self.series_release_url, params=params, timeout=10)
-                resp.raise_for_status()
-                release_payload = resp.json()
+                release_payload = self._fred_get(self.series_release_url, params)
                 releases = release_payload.get("releases") or release_payload.get(
                     "release"
                 )
@@ -381,6 +474,33 @@ class EconomicService:
             if not release_id:
                 return None
 
+            next_release = self._next_release_for(release_id)
+
+            # Cache the result
+            entry = {"release_id": release_id, "next_release": next_release}
+            self._release_cache[indicator_key] = entry
+            self._shared_cache.set(shared_key, entry, self.RELEASE_CACHE_TTL_SECONDS)
+
+            return next_release
+
+        except Exception as e:
+            print(f"Error fetching next release for {indicator_key}: {e}")
+            return None
+
+    def _next_release_for(self, release_id) -> Optional[str]:
+        """
+        Next scheduled date of a FRED release. Several series share a release
+        (DFF, DGS10 and DGS2 are all H.15), so the calendar is fetched once per
+        release id; concurrent lookups of the same release wait for that fetch.
+        """
+        with self._observation_lock:
+            lock = self._release_locks.setdefault(release_id, threading.Lock())
+        with lock:
+            today = datetime.now().date()
+            cached = self._next_release_by_id.get(release_id)
+            if cached and cached >= today.strftime("%Y-%m-%d"):
+                return cached
+
             # Query the release calendar
             params = {
                 "release_id": release_id,
@@ -393,12 +513,9 @@ class EconomicService:
                 "limit": 25,
             }
 
-            resp = requests.get(self.release_dates_url, params=params, timeout=10)
-            resp.raise_for_status()
-            dates_payload = resp.json()
+            dates_payload = self._fred_get(self.release_dates_url, params)
             release_dates = dates_payload.get("release_dates", [])
 
-            today = datetime.now().date()
             future_dates = []
             for item in release_dates:
                 date_str = item.get("date")
@@ -412,18 +529,194 @@ class EconomicService:
             next_release = (
                 min(future_dates).strftime("%Y-%m-%d") if future_dates else None
             )
+            self._next_release_by_id[release_id] = next_release
+            return next_release
 
-            # Cache the result
-            self._release_cache[indicator_key] = {
-                "release_id": release_id,
-                "next_release": next_release,
-            }
+    def score_batch(self, indicators: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized component and overall scores for many indicator rows at once
+        (e.g. a historical backtest). Columns use the _fetch_all_indicators keys;
+        a missing column, NaN or 0 counts as unavailable, as in the scalar
+        _score_* methods whose rules this mirrors.
+        """
+        n = len(indicators)
+
+        def col(name: str) -> np.ndarray:
+            if name not in indicators:
+                return np.full(n, np.nan)
+            return indicators[name].to_numpy(dtype=float, na_value=np.nan)
+
+        def missing(values: np.ndarray) -> np.ndarray:
+            return np.isnan(values) | (values == 0)
+
+        def within(values: np.ndarray, key: str) -> np.ndarray:
+            low, high = self.optimal_ranges[key]
+            return (values >= low) & (values <= high)
+
+        fed_funds, treasury_10y = col("fed_funds_rate"), col("treasury_10y")
+        rate = np.where(missing(fed_funds), treasury_10y, fed_funds)
+        inflation = col("inflation_rate")
+        gdp = col("gdp_growth")
+        unemployment = col("unemployment")
+        treasury_2y = col("treasury_2y")
+        spread = treasury_10y - treasury_2y
+        sentiment = col("consumer_sentiment")
+
+        fed_high = self.optimal_ranges["fed_funds_rate"][1]
+        inflation_high = self.optimal_ranges["inflation"][1]
+        unemployment_high = self.optimal_ranges["unemployment"][1]
+
+        scores = pd.DataFrame(
+            {
+                "interest_rates": np.select(
+                    [
+                        missing(fed_funds) & missing(treasury_10y),
+                        rate < 1.0,
+                        within(rate, "fed_funds_rate"),
+                        rate <= 6.0,
+                    ],
+                    [5.0, 7.0, 9.0, np.maximum(4.0, 9.0 - (rate - fed_high) / 2.0)],
+                    default=3.0,
+                ),
+                "inflation": np.select(
+                    [
+                        missing(inflation),
+                        inflation < 0,
+                        within(inflation, "inflation"),
+                        inflation <= 5.0,
+                    ],
+                    [
+                        5.0,
+                        4.0,
+                        9.0,
+                        np.maximum(5.0, 9.0 - (inflation - inflation_high) * 1.5),
+                    ],
+                    default=np.maximum(2.0, 10.0 - inflation),
+                ),
+                "growth": np.select(
+                    [
+                        missing(gdp),
+                        gdp < -2.0,
+                        gdp < 0,
+                        within(gdp, "gdp_growth"),
+                        gdp <= 6.0,
+                    ],
+                    [5.0, 2.0, 4.0, 9.0, 7.0],
+                    default=6.0,
+                ),
+                "employment": np.select(
+                    [
+                        missing(unemployment),
+                        unemployment < 3.0,
+                        within(unemployment, "unemployment"),
+                        unemployment <= 7.0,
+                    ],
+                    [
+                        5.0,
+                        7.0,
+                        9.0,
+                        np.maximum(4.0, 9.0 - (unemployment - unemployment_high)),
+                    ],
+                    default=np.maximum(2.0, 12.0 - unemployment),
+                ),
+                "yield_curve": np.select(
+                    [
+                        missing(treasury_10y) | missing(treasury_2y),
+                        spread < -0.5,
+                        spread < 0,
+                        (spread >= 0.5) & (spread <= 2.0),
+                        spread <= 3.0,
+                    ],
+                    [5.0, 2.0, 4.0, 9.0, 7.0],
+                    default=6.0,
+                ),
+                "sentiment": np.select(
+                    [
+                        missing(sentiment),
+                        sentiment < 60,
+                        sentiment < 70,
+                        within(sentiment, "consumer_sentiment"),
+                    ],
+                    [5.0, 3.0, 5.0, 9.0],
+                    default=8.0,
+                ),
+            },
+            index=indicators.index,
+        )
+        weights = np.array(list(self.COMPONENT_WEIGHTS.values()))
+        scores["economic_score"] = (
+            scores[list(self.COMPONENT_WEIGHTS)].to_numpy() @ weights
+        )
+        return scores
+
+    def _build_score_tables(self) -> Dict[str, "_ScoreTable"]:
+        """
+        Piecewise scoring rules as bisect tables, built once from optimal_ranges.
+        Inclusive upper bounds (x <= bound) use _upto(bound) as the breakpoint so
+        a value equal to the bound stays in the lower band.
+        """
+        rate_low, rate_high = self.optimal_ranges["fed_funds_rate"]
+        inflation_low, inflation_high = self.optimal_ranges["inflation"]
+        gdp_low, gdp_high = self.optimal_ranges["gdp_growth"]
+        unemployment_low, unemployment_high = self.optimal_ranges["unemployment"]
+        curve_low, curve_high = self.optimal_ranges["yield_curve"]
+        sentiment_low, sentiment_high = self.optimal_ranges["consumer_sentiment"]
 
-            return next_release
+        # Values between the first breakpoint and the optimal band get the same
+        # "moderate" rule as values just above it
+        def rate_pressure(rate: float) -> float:
+            return max(4.0, 9.0 - (rate - rate_high) / 2.0)
 
-        except Exception as e:
-            print(f"Error fetching next release for {indicator_key}: {e}")
-            return None
+        def inflation_pressure(value: float) -> float:
+            return max(5.0, 9.0 - (value - inflation_high) * 1.5)
+
+        def unemployment_pressure(value: float) -> float:
+            return max(4.0, 9.0 - (value - unemployment_high) * 1.0)
+
+        return {
+            # too low (bubble) | moderate | goldilocks | moderate-high | very high
+            "interest_rates": _ScoreTable(
+                [1.0, rate_low, _upto(rate_high), _upto(6.0)],
+                [7.0, rate_pressure, 9.0, rate_pressure, 3.0],
+            ),
+            # deflation | moderate | healthy | moderate | high
+            "inflation": _ScoreTable(
+                [0.0, inflation_low, _upto(inflation_high), _upto(5.0)],
+                [
+                    4.0,
+                    inflation_pressure,
+                    9.0,
+                    inflation_pressure,
+                    lambda value: max(2.0, 10.0 - value),
+                ],
+            ),
+            # recession | negative | below optimal | goldilocks | strong | overheating
+            "growth": _ScoreTable(
+                [-2.0, 0.0, gdp_low, _upto(gdp_high), _upto(6.0)],
+                [2.0, 4.0, 7.0, 9.0, 7.0, 6.0],
+            ),
+            # too low (wage inflation) | elevated | full employment | elevated | high
+            "employment": _ScoreTable(
+                [3.0, unemployment_low, _upto(unemployment_high), _upto(7.0)],
+                [
+                    7.0,
+                    unemployment_pressure,
+                    9.0,
+                    unemployment_pressure,
+                    lambda value: max(2.0, 12.0 - value),
+                ],
+            ),
+            # deeply inverted | inverted | flat | normal | steep | very steep
+            "yield_curve": _ScoreTable(
+                [-0.5, 0.0, curve_low, _upto(curve_high), _upto(3.0)],
+                [2.0, 4.0, 7.0, 9.0, 7.0, 6.0],
+            ),
+            # very pessimistic | pessimistic | optimistic | healthy | very optimistic
+            "sentiment": _ScoreTable(
+                [60.0, 70.0, sentiment_low, _upto(sentiment_high)],
+                [3.0, 5.0, 8.0, 9.0, 8.0],
+            ),
+        }
 
     def _score_interest_rates(
         self, fed_funds: Optional[float], treasury_10y: Optional[float]
@@ -437,21 +730,7 @@ class EconomicService:
             return 5.0
 
         rate = fed_funds if fed_funds else treasury_10y
-        optimal_low, optimal_high = self.optimal_ranges["fed_funds_rate"]
-
-        if rate < 1.0:
-            # Too low - potential bubble concerns
-            return 7.0
-        elif optimal_low <= rate <= optimal_high:
-            # Goldilocks - ideal for stocks
-            return 9.0
-        elif rate <= 6.0:
-            # Moderate-high rates - some pressure
-            penalty = (rate - optimal_high) / 2.0
-            return max(4.0, 9.0 - penalty)
-        else:
-            # Very high rates - significant valuation pressure
-            return 3.0
+        return self._score_tables["interest_rates"](rate)
 
     def _score_inflation(self, inflation_rate: Optional[float]) -> float:
         """
@@ -461,22 +740,7 @@ class EconomicService:
         """
         if not inflation_rate:
             return 5.0
-
-        optimal_low, optimal_high = self.optimal_ranges["inflation"]
-
-        if inflation_rate < 0:
-            # Deflation - demand concerns
-            return 4.0
-        elif optimal_low <= inflation_rate <= optimal_high:
-            # Healthy inflation
-            return 9.0
-        elif inflation_rate <= 5.0:
-            # Moderate inflation - some concerns
-            penalty = (inflation_rate - optimal_high) * 1.5
-            return max(5.0, 9.0 - penalty)
-        else:
-            # High inflation - major concern for stocks
-            return max(2.0, 10.0 - inflation_rate)
+        return self._score_tables["inflation"](inflation_rate)
 
     def _score_gdp_growth(self, gdp_growth: Optional[float]) -> float:
         """
@@ -485,24 +749,7 @@ class EconomicService:
         """
         if not gdp_growth:
             return 5.0
-
-        optimal_low, optimal_high = self.optimal_ranges["gdp_growth"]
-
-        if gdp_growth < -2.0:
-            # Recession
-            return 2.0
-        elif gdp_growth < 0:
-            # Negative growth
-            return 4.0
-        elif optimal_low <= gdp_growth <= optimal_high:
-            # Goldilocks growth
-            return 9.0
-        elif gdp_growth <= 6.0:
-            # Strong growth (may bring inflation concerns)
-            return 7.0
-        else:
-            # Overheating economy
-            return 6.0
+        return self._score_tables["growth"](gdp_growth)
 
     def _score_unemployment(self, unemployment: Optional[float]) -> float:
         """
@@ -511,22 +758,7 @@ class EconomicService:
         """
         if not unemployment:
             return 5.0
-
-        optimal_low, optimal_high = self.optimal_ranges["unemployment"]
-
-        if unemployment < 3.0:
-            # Too low - wage inflation concerns
-            return 7.0
-        elif optimal_low <= unemployment <= optimal_high:
-            # Full employment
-            return 9.0
-        elif unemployment <= 7.0:
-            # Elevated unemployment
-            penalty = (unemployment - optimal_high) * 1.0
-            return max(4.0, 9.0 - penalty)
-        else:
-            # High unemployment - recession indicator
-            return max(2.0, 12.0 - unemployment)
+        return self._score_tables["employment"](unemployment)
 
     def _score_yield_curve(
         self, treasury_10y: Optional[float], treasury_2y: Optional[float]
@@ -538,24 +770,7 @@ class EconomicService:
         """
         if not treasury_10y or not treasury_2y:
             return 5.0
-
-        spread = treasury_10y - treasury_2y
-
-        if spread < -0.5:
-            # Deeply inverted - strong recession signal
-            return 2.0
-        elif spread < 0:
-            # Inverted curve - recession warning
-            return 4.0
-        elif 0.5 <= spread <= 2.0:
-            # Normal, healthy curve
-            return 9.0
-        elif spread <= 3.0:
-            # Steep curve - recovery or inflation expectations
-            return 7.0
-        else:
-            # Very steep - unusual conditions
-            return 6.0
+        return self._score_tables["yield_curve"](treasury_10y - treasury_2y)
 
     def _score_consumer_sentiment(self, sentiment: Optional[float]) -> float:
         """
@@ -564,21 +779,7 @@ class EconomicService:
         """
         if not sentiment:
             return 5.0
-
-        optimal_low, optimal_high = self.optimal_ranges["consumer_sentiment"]
-
-        if sentiment < 60:
-            # Very pessimistic
-            return 3.0
-        elif sentiment < 70:
-            # Pessimistic
-            return 5.0
-        elif optimal_low <= sentiment <= optimal_high:
-            # Healthy confidence
-            return 9.0
-        else:
-            # Very optimistic (may signal peak)
-            return 8.0
+        return self._score_tables["sentiment"](sentiment)
 
     def _generate_analysis(
         self, economic_score: float, indicators: Dict, components: Dict